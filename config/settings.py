@@ -2,23 +2,139 @@
 Configuration settings for the Typing Trainer application.
 """
 
+import getpass
+import os
+
+# Storage locations
+USER_DATA_DIR = os.path.join(os.path.expanduser("~"), ".typing_trainer")
+RESULTS_PATH = os.path.join(USER_DATA_DIR, "results.jsonl")  # One JSON line per finished session
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+# Dictionaries available for practice: language name -> word list in DATA_DIR
+DICTIONARIES = {
+    "English": "Oxford3000.txt",
+    "Polish": "Polish.txt",
+    "German": "German.txt",
+}
+DEFAULT_LANGUAGE = "English"
+DICTIONARY_MEMORY_BUDGET = 4 * 1024 * 1024  # Bytes of loaded dictionaries before idle ones are evicted
+
+# Name recorded with saved results
+try:
+    USER_NAME = getpass.getuser()
+except Exception:
+    USER_NAME = "user"
+
+# Background writer settings
+WRITER_QUEUE_SIZE = 256  # Pending jobs before submitters wait
+WRITER_BATCH_WINDOW = 0.05  # Seconds to gather jobs into one group commit
+WRITER_LATENCY_SAMPLES = 1000  # Recent write latencies kept for statistics
+WRITER_EXIT_TIMEOUT = 2.0  # Seconds to wait for pending writes on exit
+
+# Exercise cache settings
+EXERCISE_CACHE_MEMORY = 256  # Seeded sentences kept in memory
+EXERCISE_CACHE_DISK = 4096  # Seeded sentences kept on disk
+
+# Leaderboard settings
+LEADERBOARD_SUMMARY_PATH = os.path.join(USER_DATA_DIR, "leaderboard.json")  # Written by --leaderboard
+LEADERBOARD_MIN_ELAPSED = 10  # Sessions shorter than this many seconds are left out
+LEADERBOARD_PERCENTILES = (10, 25, 50, 75, 90)
+LEADERBOARD_WORKERS = None  # Aggregator processes; None uses one per CPU
+
+# Metrics export settings
+METRICS_HOST = "127.0.0.1"  # The metrics endpoint only listens locally
+METRICS_DUMP_INTERVAL = 15  # Seconds between rewrites of the metrics file
+METRICS_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Keystroke recording settings
+RECORDINGS_DIR = os.path.join(USER_DATA_DIR, "recordings")  # One binary file per session
+RECORDING_CHUNK_KEYS = 64  # Keystrokes per chunk appended to a recording
+
+# Main loop watchdog settings
+WATCHDOG_THRESHOLD_MS = 50  # Main loop blocked longer than this counts as a stall
+WATCHDOG_HEARTBEAT_MS = 20  # Interval of the heartbeat posted through root.after
+WATCHDOG_STACK_DEPTH = 12  # Frames kept from each sampled stack
+
 # Text display settings
 LINE_SIZE = 40  # Maximum characters per line
 MIN_TEXT_LEN = 170
 MIN_WORD_SIZE = 2
 MAX_WORD_SIZE = 8
 
+# Text file practice settings
+TEXT_INDEX_BLOCK = 64 * 1024  # Bytes between entries of the sparse line index
+TEXT_WINDOW_FACTOR = 8  # Bytes mapped per chunk, as a multiple of the chunk length
+
+# Source code practice settings
+CODE_EXTENSIONS = {'.py', '.js', '.ts', '.java', '.c', '.h', '.cpp', '.hpp', '.cs', '.go', '.rs', '.rb', '.php',
+                   '.swift', '.kt', '.scala', '.sh', '.sql'}
+CODE_SNIPPET_MIN_CHARS = 60
+CODE_SNIPPET_MAX_CHARS = 400
+CODE_SNIPPET_MAX_LINES = 12
+CODE_MAX_FILE_SIZE = 1024 * 1024  # Larger files are usually generated, not written
+CODE_INDEX_WORKERS = None  # Indexing processes; None uses one per CPU
+BACKGROUND_POLL_MS = 100  # How often the main loop checks on a background task (code index, lessons)
+CODE_LINE_SIZE = 80  # Maximum characters per line for source code
+CODE_INDENT_WIDTH = 4  # Tabs in source files become this many spaces
+NEWLINE_GLYPH = "\u21b5"  # Shown where Return has to be pressed
+
+# Drill (spaced repetition) settings
+DRILL_WORDS_PER_SENTENCE = 4  # Due review words mixed into each sentence
+DRILL_FIRST_INTERVAL = 5 * 60  # Seconds until a missed word is first reviewed
+DRILL_START_EASE = 2.5  # Interval multiplier after a good review
+DRILL_MIN_EASE = 1.3
+DRILL_SLOW_FACTOR = 1.5  # Slower than this times the session average counts as weak
+DRILL_MIN_WORD_SAMPLES = 10  # Words timed before slowness is judged
+
+# Curriculum settings
+LESSON_MIN_WORDS = 50  # Lessons with fewer real words are topped up with pseudo-words
+LESSON_BUILD_WORKERS = None  # Process pool size for building lessons (None = CPU count)
+
 # Font settings
 FONT = "Helvetica"
 FONT_SIZE = 32
 MENU_FONT_SIZE = 24
+TEXT_FONT = "Courier"
 TEXT_FONT_SIZE = 32
 STATS_FONT_SIZE = 16
 TIME_FONT_SIZE = 16
 
 # UI settings
 TOP_PADDING = 30
-DEFAULT_WINDOW_SIZE = "800x400"
+FRAME_INTERVAL_MS = 33  # Tick of the shared animation scheduler (ghost cursor)
+DEFAULT_WINDOW_SIZE = "800x400"  # Minimum window size
+WINDOW_SCREEN_FRACTION = 0.6  # Initial window size relative to the screen
+TEXT_SIDE_PADDING = 20
+CHAR_SPACING = 2  # Pixels between letters
+LAYOUT_DEBOUNCE_MS = 50  # Delay before re-laying out text after a resize
+
+# Results chart settings
+CHART_HEIGHT = 150
+CHART_PADDING = 10
+CHART_FONT_SIZE = 10
+
+# Keyboard heatmap settings
+HEATMAP_KEY_SIZE = 26  # Pixels per key, live and on the results screen
+HEATMAP_FONT_SIZE = 9
+HEATMAP_LEVELS = 8  # Shades between a clean key and the worst key
+HEATMAP_ERROR_RATE_MAX = 0.2  # Error rate shown as the worst shade
+HEATMAP_FAST_MS = 150  # Average latency shown as the best shade
+HEATMAP_SLOW_MS = 600  # Average latency shown as the worst shade
+HEATMAP_MAX_LATENCY_MS = 2000  # Longer gaps are pauses, not typing
+
+# Time modes: mode name -> time limit in seconds (0 means no limit); "custom" uses the user's time
+TIME_MODES = {"1min": 60, "5min": 300, "freeplay": 0}
+MAX_CUSTOM_TIME = 24 * 60 * 60  # Longest custom time limit in seconds; recordings store it as 32 bits
+
+# Terminal front end settings
+TERMINAL_TICK_MS = 250  # Timer and stats refresh while waiting for keys
 
 # Default keys for typing exercises
-DEFAULT_KEYS = "asdfghjkl;qwertyuiop"
\ No newline at end of file
+DEFAULT_KEYS = "asdfghjkl;qwertyuiop"
+
+# Soak mode settings
+SOAK_SAMPLE_INTERVAL = 30  # Seconds between resource samples
+SOAK_KEYS_PER_SECOND = 5  # Typing speed of the synthetic driver
+SOAK_ERROR_RATE = 0.05  # Fraction of deliberately wrong keystrokes
+SOAK_CYCLE_SECONDS = 120  # Driven sessions restart through results/menu this often
+SOAK_GROWTH_TOLERANCE = 0.05  # Relative growth ignored when flagging leaks
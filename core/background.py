@@ -0,0 +1,85 @@
+"""
+Slow jobs run on a worker thread and polled from the Tk main loop.
+"""
+
+import threading
+
+from config.settings import BACKGROUND_POLL_MS
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class BackgroundTask:
+    """Run load(progress) on a worker thread, polled from the Tk main loop.
+
+    The main loop only checks on the thread every BACKGROUND_POLL_MS.
+    on_progress(done, total), if given, and on_done(result, error) are called
+    on the main loop. Register the task as a GUI service so its poll survives
+    screen changes.
+    """
+
+    def __init__(self, root, load, on_progress, on_done, name="background"):
+        self.root = root
+        self.load = load
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.timer_ids = {}
+        self.cancelled = threading.Event()
+        self.finished = threading.Event()
+        self.thread = threading.Thread(target=self.run, name=name, daemon=True)
+
+        # Written by the worker thread, read by the main loop
+        self.done = 0
+        self.total = 0
+        self.result = None
+        self.error = None
+
+    def start(self):
+        self.thread.start()
+        self.timer_ids['poll'] = self.root.after(BACKGROUND_POLL_MS, self.poll)
+
+    def get_timer_ids(self):
+        return list(self.timer_ids.values())
+
+    def run(self):
+        try:
+            self.result = self.load(self.set_progress)
+        except TaskCancelled:
+            pass
+        except Exception as e:
+            # Anything else (a broken process pool, MemoryError, ...) is reported too,
+            # so on_done always gets either a result or an error
+            self.error = e
+        finally:
+            self.finished.set()
+
+    def set_progress(self, done, total):
+        if self.cancelled.is_set():
+            raise TaskCancelled()
+        self.done, self.total = done, total
+
+    def poll(self):
+        if self.finished.is_set():
+            self.timer_ids = {}
+            if not self.cancelled.is_set():
+                self.on_done(self.result, self.error)
+            return
+        if self.on_progress:
+            self.on_progress(self.done, self.total)
+        self.timer_ids['poll'] = self.root.after(BACKGROUND_POLL_MS, self.poll)
+
+    def cancel(self):
+        """Stop the task; on_done is never called after this.
+
+        A load that does not report progress runs on to its end, but its
+        result is dropped.
+        """
+        self.cancelled.set()
+        for timer_id in self.timer_ids.values():
+            try:
+                self.root.after_cancel(timer_id)
+            except Exception:
+                pass
+        self.timer_ids = {}
@@ -0,0 +1,195 @@
+"""
+Practice snippets extracted from a directory of source code.
+
+Files are split into snippets by a process pool: Python files along ast
+function and class definitions, cut at tokenize's logical line ends; other
+languages along blank lines. Snippets are cached per directory together with
+the size and mtime of every file, so reopening a directory only re-reads the
+files that changed.
+"""
+
+import ast
+import gzip
+import hashlib
+import io
+import json
+import os
+import random
+import textwrap
+import tokenize
+
+from config.settings import (USER_DATA_DIR, CODE_EXTENSIONS, CODE_SNIPPET_MIN_CHARS, CODE_SNIPPET_MAX_CHARS,
+                             CODE_SNIPPET_MAX_LINES, CODE_INDEX_WORKERS, CODE_MAX_FILE_SIZE, CODE_INDENT_WIDTH)
+from core.background import BackgroundTask
+from core.parallel import map_changed_files
+
+CODE_INDEX_VERSION = 1
+SKIPPED_DIRECTORIES = {'.git', '.hg', '.svn', '__pycache__', 'node_modules', '.venv', 'venv', 'build', 'dist'}
+
+
+def find_source_files(directory):
+    """Return every file below directory with a source code extension."""
+    paths = []
+    for root, directories, files in os.walk(directory):
+        directories[:] = sorted(name for name in directories
+                                if name not in SKIPPED_DIRECTORIES and not name.startswith('.'))
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in CODE_EXTENSIONS:
+                paths.append(os.path.join(root, name))
+    return paths
+
+
+def clean_snippet(lines):
+    """Normalise a block of lines into typable text, or None if it is unsuitable."""
+    text = textwrap.dedent('\n'.join(line.expandtabs(CODE_INDENT_WIDTH).rstrip() for line in lines)).strip('\n')
+    if not (CODE_SNIPPET_MIN_CHARS <= len(text) <= CODE_SNIPPET_MAX_CHARS):
+        return None
+    # Only what a plain keyboard can type
+    if not all(' ' <= char <= '~' or char == '\n' for char in text):
+        return None
+    return text
+
+
+def fit_snippet(lines, line_ends):
+    """Return the longest clean snippet made of a prefix of lines that ends at a logical line end."""
+    for count in range(min(len(lines), CODE_SNIPPET_MAX_LINES), 0, -1):
+        if count in line_ends:
+            snippet = clean_snippet(lines[:count])
+            if snippet:
+                return snippet
+    return None
+
+
+def python_snippets(source):
+    """Snippets of a Python file: its functions and classes, cut at logical line ends."""
+    tree = ast.parse(source)
+    lines = source.splitlines()
+    # Line numbers where a logical line ends; a cut anywhere else would split a statement
+    line_ends = {token.end[0] for token in tokenize.generate_tokens(io.StringIO(source).readline)
+                 if token.type == tokenize.NEWLINE}
+
+    snippets = []
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        start = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+        block = lines[start - 1:node.end_lineno]
+        ends = {end - start + 1 for end in line_ends if start <= end <= node.end_lineno}
+        snippet = fit_snippet(block, ends)
+        if snippet:
+            snippets.append(snippet)
+    return snippets
+
+
+def block_snippets(source):
+    """Snippets of any other language: runs of lines separated by blank lines."""
+    snippets = []
+    block = []
+    for line in source.splitlines() + [""]:
+        if line.strip():
+            block.append(line)
+            continue
+        while block:
+            # Long blocks are cut into pieces of at most CODE_SNIPPET_MAX_LINES lines
+            snippet = clean_snippet(block[:CODE_SNIPPET_MAX_LINES])
+            if snippet:
+                snippets.append(snippet)
+            block = block[CODE_SNIPPET_MAX_LINES:]
+    return snippets
+
+
+def extract_snippets(path):
+    """Map step: return the snippets of one file (an empty list if it cannot be read)."""
+    try:
+        if os.path.getsize(path) > CODE_MAX_FILE_SIZE:
+            return []
+        with open(path, encoding='utf-8') as f:
+            source = f.read()
+    except (OSError, UnicodeDecodeError):
+        return []
+    if path.endswith('.py'):
+        try:
+            return python_snippets(source)
+        except (SyntaxError, ValueError, tokenize.TokenError, MemoryError, RecursionError):
+            pass  # Not valid Python 3, or nested too deeply for the parser; fall back to blank-line blocks
+    return block_snippets(source)
+
+
+def index_path(directory, data_dir=USER_DATA_DIR):
+    digest = hashlib.sha1(os.path.abspath(directory).encode('utf-8')).hexdigest()
+    return os.path.join(data_dir, 'code_index', digest + '.json.gz')
+
+
+def load_index(path):
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError, EOFError):
+        return {}
+    return index.get('files', {}) if index.get('version') == CODE_INDEX_VERSION else {}
+
+
+def build_index(directory, data_dir=USER_DATA_DIR, workers=CODE_INDEX_WORKERS, progress=None):
+    """Return {path: snippets} for a directory, re-reading only changed files.
+
+    progress is passed on to map_changed_files.
+    """
+    path = index_path(directory, data_dir)
+    cached = load_index(path)
+    files, changed = map_changed_files(extract_snippets, find_source_files(os.path.abspath(directory)), cached,
+                                       'snippets', workers, progress)
+
+    if changed or len(files) != len(cached):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + '.tmp'
+        with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+            json.dump({'version': CODE_INDEX_VERSION, 'files': files}, f, separators=(',', ':'))
+        os.replace(temp_path, path)
+    return {source_path: entry['snippets'] for source_path, entry in files.items()}
+
+
+class CodeTextSource:
+    """Serve source code snippets, one per sentence, in a shuffled order."""
+
+    kind = 'code'
+
+    def __init__(self, directory, data_dir=USER_DATA_DIR, rng=None, progress=None):
+        self.directory = os.path.abspath(directory)
+        if not os.path.isdir(self.directory):
+            raise ValueError(f"{directory} is not a directory")
+        self.snippets = [snippet for snippets in build_index(self.directory, data_dir, progress=progress).values()
+                         for snippet in snippets]
+        if not self.snippets:
+            raise ValueError(f"No code snippets found in {os.path.basename(self.directory)}")
+        self.rng = rng or random.Random()
+        self.order = []
+
+    @property
+    def name(self):
+        return os.path.basename(self.directory)
+
+    def next_chunk(self, max_length):
+        """Return the next snippet, whitespace intact and ending in a newline.
+
+        Snippets are kept whole, so max_length is ignored; they are bounded
+        by CODE_SNIPPET_MAX_CHARS instead.
+        """
+        if not self.order:
+            self.order = list(range(len(self.snippets)))
+            self.rng.shuffle(self.order)
+        return self.snippets[self.order.pop()] + "\n"
+
+    def close(self):
+        pass
+
+
+class CodeIndexLoader(BackgroundTask):
+    """Open a CodeTextSource off the main loop; a cold index of a large directory takes seconds.
+
+    on_done(source, error) gets the opened source.
+    """
+
+    def __init__(self, root, directory, on_progress, on_done, data_dir=USER_DATA_DIR):
+        super().__init__(root, lambda progress: CodeTextSource(directory, data_dir, progress=progress),
+                         on_progress, on_done, name="code-index")
+        self.directory = directory
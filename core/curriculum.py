@@ -0,0 +1,220 @@
+"""
+Built-in curriculum of typing lessons with precomputed word pools.
+
+Word pools, pseudo-word tables and statistics of every lesson are built by
+a process pool into a versioned artifact per language. The artifact is
+rebuilt only when the dictionary or the lesson definitions change, so
+switching lessons at runtime never filters the dictionary.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from collections import Counter
+from itertools import accumulate
+
+from config.settings import USER_DATA_DIR, LESSON_MIN_WORDS, LESSON_BUILD_WORKERS, MIN_WORD_SIZE, MAX_WORD_SIZE
+from core.parallel import process_pool
+
+ARTIFACT_VERSION = 1
+
+HOME_ROW = "asdfghjkl"
+TOP_ROW = "qwertyuiop"
+BOTTOM_ROW = "zxcvbnm"
+
+# Each lesson adds keys to the previous ones. The letters decide the word pool;
+# shift, punctuation and digits are mixed into the words when a sentence is made.
+LESSONS = [
+    {'name': "Home Row", 'letters': HOME_ROW},
+    {'name': "Top Row", 'letters': HOME_ROW + TOP_ROW},
+    {'name': "Bottom Row", 'letters': HOME_ROW + TOP_ROW + BOTTOM_ROW},
+    {'name': "Shift", 'letters': HOME_ROW + TOP_ROW + BOTTOM_ROW, 'shift': True},
+    {'name': "Punctuation", 'letters': HOME_ROW + TOP_ROW + BOTTOM_ROW, 'shift': True, 'punctuation': ".,;'"},
+    {'name': "Numbers", 'letters': HOME_ROW + TOP_ROW + BOTTOM_ROW, 'shift': True, 'punctuation': ".,;'",
+     'digits': "1234567890"},
+]
+
+SHIFT_RATE = 0.3  # Share of capitalised words in lessons with shift
+PUNCTUATION_RATE = 0.3  # Share of words followed by a punctuation mark
+NUMBER_RATE = 0.2  # Share of words replaced by a number
+
+
+def lessons_hash():
+    return hashlib.sha1(json.dumps(LESSONS, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+# Word list shared with every worker process, set once by the pool initializer
+_worker_words = []
+
+
+def _init_worker(words):
+    global _worker_words
+    _worker_words = words
+
+
+def build_lesson(lesson):
+    """Compute the word pool, pseudo-word table and statistics of one lesson."""
+    letters = set(lesson['letters'])
+    words = [word for word in _worker_words if len(word) >= MIN_WORD_SIZE and set(word) <= letters]
+
+    # Letter transitions of the whole dictionary, restricted to the lesson's letters,
+    # give pseudo-words that look like the language
+    starts = Counter()
+    transitions = {}
+    lengths = Counter()
+    for word in _worker_words:
+        if MIN_WORD_SIZE <= len(word) <= MAX_WORD_SIZE:
+            lengths[len(word)] += 1
+        if word[0] in letters:
+            starts[word[0]] += 1
+        for first, second in zip(word, word[1:]):
+            if first in letters and second in letters:
+                transitions.setdefault(first, Counter())[second] += 1
+
+    covered = set(''.join(words)) & letters
+    return {
+        'name': lesson['name'],
+        'letters': lesson['letters'],
+        'shift': lesson.get('shift', False),
+        'punctuation': lesson.get('punctuation', ''),
+        'digits': lesson.get('digits', ''),
+        'words': words,
+        'pseudo': {
+            'starts': sorted(starts.items()),
+            'transitions': {letter: sorted(counts.items()) for letter, counts in sorted(transitions.items())},
+            'lengths': sorted(lengths.items()),
+        },
+        'stats': {
+            'word_count': len(words),
+            'average_length': sum(map(len, words)) / len(words) if words else 0,
+            'letter_coverage': len(covered) / len(letters),
+            'uncovered_letters': ''.join(sorted(letters - covered)),
+        },
+    }
+
+
+def build_curriculum(dictionary, workers=LESSON_BUILD_WORKERS):
+    """Build all lessons for a dictionary in parallel and return the artifact.
+
+    If the process pool cannot be started or breaks (e.g. a worker is
+    killed), the lessons are built in this process instead.
+    """
+    try:
+        with process_pool(workers, initializer=_init_worker, initargs=(dictionary.words,)) as pool:
+            lessons = list(pool.map(build_lesson, LESSONS))
+    except (OSError, RuntimeError):  # BrokenProcessPool is a RuntimeError
+        _init_worker(dictionary.words)
+        lessons = [build_lesson(lesson) for lesson in LESSONS]
+    return {
+        'version': ARTIFACT_VERSION,
+        'language': dictionary.language,
+        'dictionary_hash': dictionary.content_hash,
+        'lessons_hash': lessons_hash(),
+        'lessons': lessons,
+    }
+
+
+def artifact_path(language, data_dir=USER_DATA_DIR):
+    return os.path.join(data_dir, 'curriculum', f"{language}.json.gz")
+
+
+def load_curriculum(dictionary, data_dir=USER_DATA_DIR):
+    """Return the curriculum for a dictionary, rebuilding the artifact if it is stale."""
+    path = artifact_path(dictionary.language, data_dir)
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            artifact = json.load(f)
+        if (artifact.get('version') == ARTIFACT_VERSION
+                and artifact.get('dictionary_hash') == dictionary.content_hash
+                and artifact.get('lessons_hash') == lessons_hash()):
+            return Curriculum(artifact)
+    except (OSError, ValueError, EOFError):
+        pass
+
+    artifact = build_curriculum(dictionary)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + '.tmp'
+        with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+            json.dump(artifact, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, path)
+    except OSError:
+        pass  # The artifact is only a cache; use the one built in memory
+    return Curriculum(artifact)
+
+
+class Lesson:
+    """One precomputed lesson, ready to hand out words."""
+
+    def __init__(self, data):
+        self.name = data['name']
+        self.letters = data['letters']
+        self.shift = data['shift']
+        self.punctuation = data['punctuation']
+        self.digits = data['digits']
+        self.words = data['words']
+        self.stats = data['stats']
+
+        # Cumulative weights let rng.choices pick in O(log n)
+        pseudo = data['pseudo']
+        self.start_letters, self.start_weights = self.table(pseudo['starts'])
+        self.length_values, self.length_weights = self.table(pseudo['lengths'])
+        self.transitions = {letter: self.table(counts) for letter, counts in pseudo['transitions'].items()}
+        self.pseudo_rate = max(0.0, 1 - len(self.words) / LESSON_MIN_WORDS)
+
+    @staticmethod
+    def table(pairs):
+        values = [value for value, _ in pairs]
+        return values, list(accumulate(weight for _, weight in pairs))
+
+    @property
+    def keys(self):
+        """All keys practised in this lesson, as used for custom keys."""
+        keys = self.letters + self.punctuation + self.digits
+        if self.shift:
+            keys += self.letters.upper()
+        return keys
+
+    def pseudo_word(self, rng):
+        """Make a pronounceable non-word from the lesson's letters."""
+        length = rng.choices(self.length_values, cum_weights=self.length_weights)[0] if self.length_values else 4
+        if self.start_letters:
+            letter = rng.choices(self.start_letters, cum_weights=self.start_weights)[0]
+        else:
+            letter = rng.choice(self.letters)
+        word = letter
+        while len(word) < length:
+            values, weights = self.transitions.get(word[-1], (None, None))
+            letter = rng.choices(values, cum_weights=weights)[0] if values else rng.choice(self.letters)
+            if word[-2:] == letter * 2:
+                # No letter three times in a row
+                letter = rng.choice([other for other in self.letters if other != letter] or self.letters)
+            word += letter
+        return word
+
+    def next_word(self, rng):
+        """Return one practice word with the lesson's extra keys mixed in."""
+        if self.digits and rng.random() < NUMBER_RATE:
+            return ''.join(rng.choice(self.digits) for _ in range(rng.randint(1, 4)))
+        if not self.words or rng.random() < self.pseudo_rate:
+            word = self.pseudo_word(rng)
+        else:
+            word = rng.choice(self.words)
+        if self.shift and rng.random() < SHIFT_RATE:
+            word = word.capitalize()
+        if self.punctuation and rng.random() < PUNCTUATION_RATE:
+            word += rng.choice(self.punctuation)
+        return word
+
+
+class Curriculum:
+    def __init__(self, artifact):
+        self.language = artifact['language']
+        self.lessons = [Lesson(data) for data in artifact['lessons']]
+
+    def get(self, name):
+        for lesson in self.lessons:
+            if lesson.name == name:
+                return lesson
+        raise KeyError(f"Unknown lesson: {name}")
@@ -0,0 +1,160 @@
+"""
+Word dictionaries for several languages, loaded lazily and shared.
+"""
+
+import hashlib
+import os
+import sys
+import unicodedata
+from collections import Counter, OrderedDict
+
+from config.settings import DATA_DIR, DICTIONARIES, DICTIONARY_MEMORY_BUDGET
+from core.metrics import DICTIONARY_LOAD_SECONDS
+
+# Used when the English word list cannot be read
+BASIC_WORDS = ["the", "be", "to", "of", "and", "a", "in", "that", "have",
+    "it", "for", "not", "on", "with", "he", "as", "you", "do", "at",
+    "this", "but", "his", "by", "from", "they", "we", "say", "her",
+    "she", "or", "an", "will", "my", "one", "all", "would", "there"]
+
+QUERY_CACHE_SIZE = 32  # Key sets remembered per dictionary
+
+
+def normalize(text):
+    """Normalize text so composed and decomposed accents compare equal."""
+    return unicodedata.normalize('NFC', text).lower()
+
+
+def is_word(text):
+    """True if every character is a letter (or a combining accent)."""
+    return bool(text) and all(unicodedata.category(char)[0] in 'LM' for char in text)
+
+
+def can_form(word, keys_to_use):
+    """True if word can be typed using each key at most as often as it is given."""
+    keys = normalize(''.join(keys_to_use))
+    if len(word) > len(keys):
+        return False
+    available = Counter(keys)
+    return all(available[letter] >= count for letter, count in Counter(word).items())
+
+
+class WordDictionary:
+    """The words of one language with an index by the set of letters used."""
+
+    def __init__(self, language, words):
+        self.language = language
+        self.words = []
+        self.counts = {}  # Letter counts, only for words that repeat a letter
+        self.index = {}  # frozenset of letters -> positions in self.words
+        self.query_cache = OrderedDict()
+
+        seen = set()
+        for word in words:
+            if word in seen:
+                continue
+            seen.add(word)
+            letters = frozenset(word)
+            if len(letters) < len(word):
+                self.counts[len(self.words)] = Counter(word)
+            self.index.setdefault(letters, []).append(len(self.words))
+            self.words.append(word)
+
+        # Identifies the exact word list, e.g. for reproducible exercises
+        self.content_hash = hashlib.sha1('\n'.join(self.words).encode('utf-8')).hexdigest()
+        self.memory_size = self.estimate_memory()
+
+    @classmethod
+    @DICTIONARY_LOAD_SECONDS.time
+    def from_file(cls, language, path):
+        with open(path, encoding='utf-8') as f:
+            words = [normalize(line.strip()) for line in f]
+        return cls(language, [word for word in words if is_word(word)])
+
+    def estimate_memory(self):
+        """Approximate bytes held by the words and the index."""
+        size = sys.getsizeof(self.words) + sys.getsizeof(self.index) + sys.getsizeof(self.counts)
+        size += sum(sys.getsizeof(word) for word in self.words)
+        size += sum(sys.getsizeof(letters) + sys.getsizeof(positions) for letters, positions in self.index.items())
+        size += sum(sys.getsizeof(counts) for counts in self.counts.values())
+        return size
+
+    def find_words(self, keys_to_use, min_length=3):
+        """Return the words that can be formed using the given letters.
+
+        As before, each key may be used as many times as it appears in
+        keys_to_use. Only letter sets that are a subset of the keys are
+        visited, and results are cached per key set, in dictionary order.
+        """
+        keys = normalize(''.join(keys_to_use))
+        cache_key = (''.join(sorted(keys)), min_length)
+        if cache_key in self.query_cache:
+            self.query_cache.move_to_end(cache_key)
+            return self.query_cache[cache_key]
+
+        available = Counter(keys)
+        letters = frozenset(available)
+        positions = []
+        for word_letters, word_positions in self.index.items():
+            if not word_letters <= letters:
+                continue
+            for position in word_positions:
+                word = self.words[position]
+                if len(word) < min_length or len(word) > len(keys):
+                    continue
+                counts = self.counts.get(position)
+                if counts and any(available[letter] < count for letter, count in counts.items()):
+                    continue
+                positions.append(position)
+
+        valid_words = [self.words[position] for position in sorted(positions)]
+        self.query_cache[cache_key] = valid_words
+        if len(self.query_cache) > QUERY_CACHE_SIZE:
+            self.query_cache.popitem(last=False)
+        return valid_words
+
+
+class DictionaryRegistry:
+    """Load dictionaries on first use and evict idle ones over a memory budget."""
+
+    def __init__(self, dictionaries=DICTIONARIES, data_dir=DATA_DIR, memory_budget=DICTIONARY_MEMORY_BUDGET):
+        self.dictionaries = dictionaries
+        self.data_dir = data_dir
+        self.memory_budget = memory_budget
+        self.loaded = OrderedDict()  # Least recently used first
+
+    def languages(self):
+        return list(self.dictionaries)
+
+    def path(self, language):
+        return os.path.join(self.data_dir, self.dictionaries[language])
+
+    def get(self, language):
+        """Return the dictionary for a language, loading it if needed."""
+        if language in self.loaded:
+            self.loaded.move_to_end(language)
+            self.evict(keep=language)
+            return self.loaded[language]
+
+        if language not in self.dictionaries:
+            raise KeyError(f"Unknown language: {language}")
+        try:
+            dictionary = WordDictionary.from_file(language, self.path(language))
+        except OSError:
+            # Fallback to a basic word list
+            dictionary = WordDictionary(language, BASIC_WORDS)
+
+        self.loaded[language] = dictionary
+        self.evict(keep=language)
+        return dictionary
+
+    def memory_size(self):
+        return sum(dictionary.memory_size for dictionary in self.loaded.values())
+
+    def evict(self, keep):
+        """Drop least recently used dictionaries until the budget is met."""
+        for language in list(self.loaded):
+            if self.memory_size() <= self.memory_budget:
+                break
+            if language != keep:
+                del self.loaded[language]
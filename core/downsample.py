@@ -0,0 +1,46 @@
+"""
+Downsampling helpers for plotting long time series.
+"""
+
+def lttb(points, threshold):
+    """Reduce a list of (x, y) points with Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last point and, for every bucket in between, the point
+    forming the largest triangle with the previously kept point and the average
+    of the next bucket. This preserves peaks and dips far better than taking
+    every n-th sample while running in linear time.
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0  # Index of the previously selected point
+
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third vertex of the triangle
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        next_count = next_end - next_start
+        avg_x = sum(points[j][0] for j in range(next_start, next_end)) / next_count
+        avg_y = sum(points[j][1] for j in range(next_start, next_end)) / next_count
+
+        # Pick the point of the current bucket with the largest triangle
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        ax, ay = points[a]
+        max_area = -1
+        max_index = start
+        for j in range(start, end):
+            x, y = points[j]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > max_area:
+                max_area = area
+                max_index = j
+
+        sampled.append(points[max_index])
+        a = max_index
+
+    sampled.append(points[-1])
+    return sampled
@@ -0,0 +1,238 @@
+"""
+Spaced-repetition scheduling of words the user mistyped or typed slowly.
+"""
+
+import heapq
+import os
+import struct
+import time
+import zlib
+from array import array
+from collections import OrderedDict
+
+from config.settings import (USER_DATA_DIR, DRILL_FIRST_INTERVAL, DRILL_START_EASE, DRILL_MIN_EASE,
+                             DRILL_SLOW_FACTOR, DRILL_MIN_WORD_SAMPLES)
+from core.dictionary_registry import normalize, is_word
+from core.persistence import write_file
+
+STATE_MAGIC = b'TTDS'
+STATE_VERSION = 1
+STATE_HEADER = struct.Struct('<4sBI')  # magic, version, word count
+
+# Review quality on the SM-2 scale
+QUALITY_MISSED = 1
+QUALITY_SLOW = 3
+QUALITY_GOOD = 5
+
+MAX_VIEWS = 4  # Filtered due heaps kept, one per key set recently drilled
+
+
+class DrillScheduler:
+    """Track weak words and decide when each one is due for review.
+
+    Word state lives in a dict; due times are kept in a heap with lazy
+    deletion, so rescheduling a word is a single O(log n) push and stale
+    heap entries are skipped (and periodically compacted away).
+
+    Due words that must pass a filter (typable with the current keys) are
+    served from a separate heap per filter, holding only the words that pass
+    it, so words the filter rejects can never crowd out those it accepts.
+    """
+
+    def __init__(self, path=os.path.join(USER_DATA_DIR, 'drill_state.bin')):
+        self.path = path
+        self.words = {}  # word -> [due, interval, ease, repetitions, lapses]
+        self.heap = []  # (due, word); an entry is stale if due no longer matches
+        self.views = OrderedDict()  # Filter key -> (accept, heap of the accepted words), least recent first
+        self.dirty = False
+        self.load()
+
+    def __len__(self):
+        return len(self.words)
+
+    def record(self, word, quality, now=None):
+        """Update a word after it was typed with the given quality (0-5)."""
+        now = time.time() if now is None else now
+        state = self.words.get(word)
+        if state is None:
+            if quality >= QUALITY_GOOD:
+                return  # Only words that caused trouble are tracked
+            state = [0.0, 0.0, DRILL_START_EASE, 0, 0]
+            self.words[word] = state
+
+        due, interval, ease, repetitions, lapses = state
+        if quality < QUALITY_SLOW:
+            repetitions = 0
+            lapses += 1
+            interval = DRILL_FIRST_INTERVAL
+        else:
+            repetitions += 1
+            interval = DRILL_FIRST_INTERVAL if repetitions == 1 else interval * ease
+        # SM-2 ease update
+        ease = max(DRILL_MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+
+        # A new list (not an in-place update) keeps snapshots taken by save() intact
+        state = [now + interval, interval, ease, min(repetitions, 0xFFFF), min(lapses, 0xFFFF)]
+        self.words[word] = state
+        heapq.heappush(self.heap, (state[0], word))
+        for accept, heap in self.views.values():
+            if accept(word):
+                heapq.heappush(heap, (state[0], word))
+        self.dirty = True
+        if len(self.heap) > 2 * len(self.words) + 64:
+            self.compact()
+
+    def compact(self):
+        """Rebuild the heap without stale entries."""
+        self.heap = [(state[0], word) for word, state in self.words.items()]
+        heapq.heapify(self.heap)
+        self.views.clear()  # Rebuilt without stale entries on their next use
+
+    def view_heap(self, key, accept):
+        """Return the heap of due entries accepted by accept, building it on first use."""
+        view = self.views.get(key)
+        if view is None:
+            heap = [(state[0], word) for word, state in self.words.items() if accept(word)]
+            heapq.heapify(heap)
+            view = self.views[key] = (accept, heap)
+            if len(self.views) > MAX_VIEWS:
+                self.views.popitem(last=False)
+        else:
+            self.views.move_to_end(key)
+        return view[1]
+
+    def due_words(self, limit, accept=None, now=None, max_scan=64, key=None):
+        """Return up to limit due words, most overdue first.
+
+        Words rejected by accept (e.g. not typable with the current keys)
+        are skipped. Given a key naming the filter (the same key must always
+        mean the same filter), the words are drawn from that filter's own
+        heap, so every entry examined is one it accepts. At most max_scan due
+        entries are examined so the cost per sentence stays bounded however
+        many words are tracked.
+        """
+        now = time.time() if now is None else now
+        filtered = accept is not None and key is not None
+        heap = self.view_heap(key, accept) if filtered else self.heap
+        selected = []
+        examined = []
+        while heap and len(selected) < limit and len(examined) < max_scan:
+            due, word = heap[0]
+            if due > now:
+                break
+            heapq.heappop(heap)
+            state = self.words.get(word)
+            if state is None or state[0] != due:
+                continue  # Stale entry
+            examined.append((due, word))
+            if filtered or accept is None or accept(word):
+                selected.append(word)
+
+        # Served words stay due until they are actually typed
+        for entry in examined:
+            heapq.heappush(heap, entry)
+        return selected
+
+    def load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                magic, version, count = STATE_HEADER.unpack(f.read(STATE_HEADER.size))
+                body = zlib.decompress(f.read())
+        except (OSError, struct.error, zlib.error):
+            return
+        if magic != STATE_MAGIC or version != STATE_VERSION:
+            return
+
+        # Columns: due (d), interval (f), ease (f), repetitions (H), lapses (H), then the words
+        columns = []
+        offset = 0
+        for typecode in 'dffHH':
+            column = array(typecode)
+            size = column.itemsize * count
+            column.frombytes(body[offset:offset + size])
+            columns.append(column)
+            offset += size
+        words = body[offset:].decode('utf-8').split('\n') if count else []
+
+        for word, *state in zip(words, *columns):
+            self.words[word] = state
+        self.compact()
+
+    def serialize(self, snapshot=None):
+        """Return the compact binary form of the scheduler state (or of a snapshot of it)."""
+        snapshot = self.words if snapshot is None else snapshot
+        words = list(snapshot)
+        states = [snapshot[word] for word in words]
+        body = b''.join(array(typecode, [state[i] for state in states]).tobytes()
+                        for i, typecode in enumerate('dffHH'))
+        body += '\n'.join(words).encode('utf-8')
+        return STATE_HEADER.pack(STATE_MAGIC, STATE_VERSION, len(words)) + zlib.compress(body)
+
+    def save(self, writer=None):
+        """Save the state, on the writer's thread if a BackgroundWriter is given."""
+        if not self.dirty:
+            return
+        self.dirty = False
+        if writer is None:
+            write_file(self.path, self.serialize())
+            return
+        # Copying the dict is cheap; serializing it happens off the main thread
+        snapshot = dict(self.words)
+        writer.call(lambda: write_file(self.path, self.serialize(snapshot)))
+
+
+class WordTracker:
+    """Turn per-character keystroke results into per-word review grades."""
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.text = None
+        self.word_start = 0
+        self.first_key_time = None
+        self.had_error = False
+        self.word_count = 0
+        self.average_char_time = 0.0
+
+    def reset(self, text):
+        self.text = text
+        self.word_start = 0
+        self.first_key_time = None
+        self.had_error = False
+
+    def on_keystroke(self, text, index, typed, is_correct, timestamp):
+        """Handle one keystroke; typed is None for backspace."""
+        if text is not self.text:
+            self.reset(text)
+        if typed is None or index >= len(text):
+            return
+
+        if text[index] != ' ':
+            if self.first_key_time is None:
+                self.first_key_time = timestamp
+            if not is_correct:
+                self.had_error = True
+            return
+
+        # The space after a word completes it
+        self.finish_word(text[self.word_start:index], timestamp)
+        self.word_start = index + 1
+        self.first_key_time = None
+        self.had_error = False
+
+    def finish_word(self, raw_word, timestamp):
+        word = normalize(raw_word.strip('.,;:!?"\'()[]'))
+        if len(word) < 3 or not is_word(word) or self.first_key_time is None:
+            return
+
+        char_time = (timestamp - self.first_key_time) / len(word)
+        slow = (self.word_count >= DRILL_MIN_WORD_SAMPLES
+                and char_time > self.average_char_time * DRILL_SLOW_FACTOR)
+        self.word_count += 1
+        self.average_char_time += (char_time - self.average_char_time) / min(self.word_count, 50)
+
+        if self.had_error:
+            self.scheduler.record(word, QUALITY_MISSED)
+        elif slow:
+            self.scheduler.record(word, QUALITY_SLOW)
+        else:
+            self.scheduler.record(word, QUALITY_GOOD)
@@ -0,0 +1,118 @@
+"""
+Cache of seeded exercises, addressed by a hash of everything that decides their text.
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+from config.settings import USER_DATA_DIR, EXERCISE_CACHE_MEMORY, EXERCISE_CACHE_DISK
+from core.persistence import write_file
+
+EXERCISE_VERSION = 1
+
+
+def exercise_key(*parts):
+    """Address of an exercise: a hash of its inputs (dictionary hash, keys, seed, length, ...)."""
+    description = json.dumps([EXERCISE_VERSION, *parts], ensure_ascii=False)
+    return hashlib.sha256(description.encode('utf-8')).hexdigest()
+
+
+class ExerciseCache:
+    """Two-level LRU cache of exercise texts: a small dict in memory, files on disk.
+
+    The same inputs always give the same address, so an exercise generated
+    once is served unchanged on every later launch, and a cache directory
+    copied to another machine serves the same bytes there.
+    """
+
+    def __init__(self, directory=os.path.join(USER_DATA_DIR, 'exercises'), writer=None,
+                 memory_entries=EXERCISE_CACHE_MEMORY, disk_entries=EXERCISE_CACHE_DISK):
+        self.directory = directory
+        self.writer = writer
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.memory = OrderedDict()  # key -> text, least recently used first
+        self.disk_count = None  # Files on disk, counted on the first store
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.txt')
+
+    def get(self, key):
+        """Return the cached text or None."""
+        text = self.memory.get(key)
+        if text is not None:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return text
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as f:
+                text = f.read().decode('utf-8')
+        except (OSError, UnicodeDecodeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.remember(key, text)
+        if self.writer:
+            self.writer.call(lambda: self.touch(path))
+        else:
+            self.touch(path)
+        return text
+
+    def touch(self, path):
+        """Mark a file as used; its mtime is its last use, for disk eviction."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def put(self, key, text):
+        self.remember(key, text)
+        if self.writer:
+            self.writer.call(lambda: self.store(key, text))
+        else:
+            self.store(key, text)
+
+    def remember(self, key, text):
+        self.memory[key] = text
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def store(self, key, text):
+        """Write one exercise to disk and evict the least recently used files over the limit."""
+        path = self.path(key)
+        exists = os.path.exists(path)
+        write_file(path, text)
+        if self.disk_count is None:
+            self.disk_count = len(self.disk_files())
+        elif not exists:
+            self.disk_count += 1
+        if self.disk_count > self.disk_entries:
+            self.evict()
+
+    def disk_files(self):
+        files = []
+        try:
+            subdirectories = list(os.scandir(self.directory))
+        except OSError:
+            return files
+        for subdirectory in subdirectories:
+            if subdirectory.is_dir():
+                files.extend(entry for entry in os.scandir(subdirectory.path) if entry.name.endswith('.txt'))
+        return files
+
+    def evict(self):
+        # Evict down to 90% so a full cache isn't rescanned on every store
+        files = sorted(self.disk_files(), key=lambda entry: entry.stat().st_mtime)
+        excess = len(files) - int(self.disk_entries * 0.9)
+        for entry in files[:max(0, excess)]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+        self.disk_count = len(files) - max(0, excess)
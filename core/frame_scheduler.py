@@ -0,0 +1,49 @@
+"""
+Shared frame tick for animations drawn on top of the typing screen.
+"""
+
+import time
+from config.settings import FRAME_INTERVAL_MS
+
+class FrameScheduler:
+    """Run every subscribed callback from a single root.after loop.
+
+    Animations subscribe instead of scheduling their own after() calls, so
+    the Tk event queue holds at most one pending tick however many of them
+    are active. The loop stops by itself when nobody is subscribed.
+    """
+
+    def __init__(self, root, interval_ms=FRAME_INTERVAL_MS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.callbacks = []
+        self.timer_id = None
+
+    def subscribe(self, callback):
+        if callback not in self.callbacks:
+            self.callbacks.append(callback)
+        if self.timer_id is None:
+            self.timer_id = self.root.after(self.interval_ms, self.tick)
+
+    def unsubscribe(self, callback):
+        if callback in self.callbacks:
+            self.callbacks.remove(callback)
+        if not self.callbacks:
+            self.stop()
+
+    def stop(self):
+        if self.timer_id is not None:
+            try:
+                self.root.after_cancel(self.timer_id)
+            except Exception:
+                pass
+            self.timer_id = None
+
+    def get_timer_ids(self):
+        return [self.timer_id] if self.timer_id is not None else []
+
+    def tick(self):
+        now = time.time()
+        for callback in list(self.callbacks):
+            callback(now)
+        self.timer_id = self.root.after(self.interval_ms, self.tick) if self.callbacks else None
@@ -0,0 +1,101 @@
+"""
+Recording and replay of typing runs for racing against a personal best.
+"""
+
+import hashlib
+import json
+import os
+from bisect import bisect_right
+
+from config.settings import USER_DATA_DIR
+from core.persistence import write_file
+
+GHOST_VERSION = 1
+
+
+def ghost_key(keys, language, time_limit, dictionary_hash, lesson=None, exam_seed=None):
+    """Identify the conditions under which runs can be compared.
+
+    Exam sessions derive every sentence from the exam seed instead of
+    seeding one generator for the session, so each exam gets its own key.
+    """
+    parts = [GHOST_VERSION, keys, language, time_limit, dictionary_hash, lesson]
+    if exam_seed is not None:
+        parts.append(['exam', exam_seed])  # Appended only here so keys of normal runs are unchanged
+    description = json.dumps(parts)
+    return hashlib.sha1(description.encode('utf-8')).hexdigest()
+
+
+class GhostRecorder:
+    """Record the cursor position over time as a keystroke listener."""
+
+    def __init__(self):
+        self.start_time = 0
+        self.times = []  # Milliseconds since the start of the session
+        self.positions = []  # Cursor position counted over the whole session
+        self.text = None
+        self.offset = 0  # Characters in the sentences already finished
+
+    def start(self, start_time):
+        self.start_time = start_time
+        self.times = []
+        self.positions = []
+        self.text = None
+        self.offset = 0
+
+    def on_keystroke(self, text, index, typed, is_correct, timestamp):
+        if text is not self.text:
+            if self.text is not None:
+                self.offset += len(self.text)
+            self.text = text
+        # After a keystroke the cursor is past the typed character; backspace
+        # reports the index it moved back to
+        position = self.offset + index + (1 if typed is not None else 0)
+        self.times.append(int((timestamp - self.start_time) * 1000))
+        self.positions.append(position)
+
+
+class GhostPlayer:
+    """Answer where the recorded cursor was at a given time."""
+
+    def __init__(self, run):
+        self.times = run['times']
+        self.positions = run['positions']
+
+    def position_at(self, elapsed):
+        i = bisect_right(self.times, int(elapsed * 1000))
+        return self.positions[i - 1] if i else 0
+
+
+class GhostStore:
+    """Best runs on disk, one file per ghost key."""
+
+    def __init__(self, directory=os.path.join(USER_DATA_DIR, 'ghosts'), writer=None):
+        self.directory = directory
+        self.writer = writer
+
+    def path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def load_best(self, key):
+        try:
+            with open(self.path(key)) as f:
+                run = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return run if run.get('version') == GHOST_VERSION else None
+
+    def save_if_best(self, key, run):
+        """Store the run if it beats the saved one (on the writer thread if there is one)."""
+        if self.writer:
+            self.writer.call(lambda: self.store_if_best(key, run))
+        else:
+            self.store_if_best(key, run)
+
+    def store_if_best(self, key, run):
+        """Compare with the saved best and replace it; returns True if stored."""
+        best = self.load_best(key)
+        if best and best['wpm'] >= run['wpm']:
+            return False
+        write_file(self.path(key), json.dumps(dict(run, version=GHOST_VERSION), separators=(',', ':')))
+        return True
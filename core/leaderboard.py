@@ -0,0 +1,255 @@
+"""
+Leaderboards and aggregate statistics over the results logs of many users.
+
+Every results file is reduced to a partial aggregate by a process pool (map);
+the partials are then merged into leaderboards, percentile bands and weekly
+trends (reduce). Partials are cached in a manifest with the size and mtime
+of their file, so a rerun only reads files that changed since the last run.
+"""
+
+import datetime
+import json
+import os
+import time
+from collections import Counter
+
+from config.settings import (LEADERBOARD_SUMMARY_PATH, LEADERBOARD_MIN_ELAPSED, LEADERBOARD_PERCENTILES,
+                             LEADERBOARD_WORKERS)
+from core.parallel import map_changed_files
+from core.persistence import write_file
+
+MANIFEST_VERSION = 1
+ALL_KEYS = "*"  # Key set that combines every session of a user
+
+
+def key_set(keys):
+    """Canonical form of a key set, so the same keys in another order compare equal."""
+    return ''.join(sorted(set(keys)))
+
+
+def find_results_files(directory):
+    """Return every results log (*.jsonl) below directory."""
+    paths = []
+    for root, _, files in os.walk(directory):
+        paths.extend(os.path.join(root, name) for name in files if name.endswith('.jsonl'))
+    return sorted(paths)
+
+
+def new_partial():
+    return {'sessions': 0, 'wpm_sum': 0, 'accuracy_sum': 0.0, 'best_wpm': 0, 'histogram': {}, 'weeks': {}}
+
+
+def aggregate_file(path):
+    """Map step: reduce one results log to {user: {key set: partial}}."""
+    # Logs are per user; older records without a user field belong to the file's owner
+    default_user = os.path.splitext(os.path.basename(path))[0]
+    if default_user == 'results':
+        default_user = os.path.basename(os.path.dirname(os.path.abspath(path)))
+
+    partials = {}
+    try:
+        f = open(path, encoding='utf-8', errors='replace')
+    except OSError:
+        return partials  # Deleted or unreadable since it was listed; skipped
+    with f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                wpm = int(record['wpm'])
+                accuracy = float(record['accuracy'])
+                elapsed = float(record.get('elapsed', 0))
+                timestamp = float(record['timestamp'])
+            except (ValueError, KeyError, TypeError):
+                continue  # Partly written or foreign line
+            if elapsed < LEADERBOARD_MIN_ELAPSED:
+                continue
+            user = record.get('user') or default_user
+            week = time.strftime('%G-W%V', time.gmtime(timestamp))
+
+            user_partials = partials.setdefault(user, {})
+            for keys in (key_set(record.get('keys') or ""), ALL_KEYS):
+                partial = user_partials.setdefault(keys, new_partial())
+                partial['sessions'] += 1
+                partial['wpm_sum'] += wpm
+                partial['accuracy_sum'] += accuracy
+                partial['best_wpm'] = max(partial['best_wpm'], wpm)
+                # JSON object keys are strings, so the histogram and weeks are keyed by strings too
+                partial['histogram'][str(wpm)] = partial['histogram'].get(str(wpm), 0) + 1
+                week_sum = partial['weeks'].setdefault(week, [0, 0])
+                week_sum[0] += wpm
+                week_sum[1] += 1
+    return partials
+
+
+def merge_partial(total, partial):
+    total['sessions'] += partial['sessions']
+    total['wpm_sum'] += partial['wpm_sum']
+    total['accuracy_sum'] += partial['accuracy_sum']
+    total['best_wpm'] = max(total['best_wpm'], partial['best_wpm'])
+    for wpm, count in partial['histogram'].items():
+        total['histogram'][wpm] = total['histogram'].get(wpm, 0) + count
+    for week, (wpm_sum, count) in partial['weeks'].items():
+        week_sum = total['weeks'].setdefault(week, [0, 0])
+        week_sum[0] += wpm_sum
+        week_sum[1] += count
+
+
+def percentiles(histogram, points=LEADERBOARD_PERCENTILES):
+    """Return {point: wpm} read off a WPM histogram."""
+    counts = sorted((int(wpm), count) for wpm, count in histogram.items())
+    total = sum(count for _, count in counts)
+    bands = {}
+    for point in points:
+        target = point / 100 * total
+        seen = 0
+        for wpm, count in counts:
+            seen += count
+            if seen >= target:
+                bands[str(point)] = wpm
+                break
+    return bands
+
+
+def share_below(histogram, wpm):
+    """Fraction of the sessions in a histogram slower than wpm."""
+    total = sum(histogram.values())
+    if not total:
+        return None
+    return sum(count for value, count in histogram.items() if int(value) < wpm) / total
+
+
+def week_number(week):
+    """Weeks since the start of the calendar for an ISO week like '2024-W05'."""
+    year, number = week.split('-W')
+    return datetime.date.fromisocalendar(int(year), int(number), 1).toordinal() // 7
+
+
+def trend(weeks):
+    """Weekly average WPM and its least-squares slope in WPM per week.
+
+    Weeks without sessions are gaps in time, not skipped, so the slope
+    follows the calendar.
+    """
+    series = [[week, wpm_sum / count] for week, (wpm_sum, count) in sorted(weeks.items())]
+    slope = 0.0
+    if len(series) > 1:
+        xs = [week_number(week) for week, _ in series]
+        mean_x = sum(xs) / len(xs)
+        mean_y = sum(wpm for _, wpm in series) / len(series)
+        slope = (sum((x - mean_x) * (wpm - mean_y) for x, (_, wpm) in zip(xs, series))
+                 / sum((x - mean_x) ** 2 for x in xs))
+    return {'weeks': [[week, round(wpm, 1)] for week, wpm in series], 'slope': round(slope, 2)}
+
+
+def build_summary(partials_by_file):
+    """Reduce step: merge the partials of all files into the summary."""
+    merged = {}  # key set -> user -> partial
+    for partials in partials_by_file:
+        for user, user_partials in partials.items():
+            for keys, partial in user_partials.items():
+                merge_partial(merged.setdefault(keys, {}).setdefault(user, new_partial()), partial)
+
+    key_sets = {}
+    users = {}
+    for keys, user_partials in merged.items():
+        histogram = Counter()
+        board = []
+        for user, partial in user_partials.items():
+            for wpm, count in partial['histogram'].items():
+                histogram[wpm] += count
+            board.append({
+                'user': user,
+                'sessions': partial['sessions'],
+                'best_wpm': partial['best_wpm'],
+                'average_wpm': round(partial['wpm_sum'] / partial['sessions'], 1),
+                'average_accuracy': round(partial['accuracy_sum'] / partial['sessions'], 1),
+            })
+            users.setdefault(user, {})[keys] = trend(partial['weeks'])
+        board.sort(key=lambda entry: (-entry['best_wpm'], -entry['average_wpm'], entry['user']))
+        key_sets[keys] = {
+            'sessions': sum(histogram.values()),
+            'leaderboard': board,
+            'percentiles': percentiles(histogram),
+            'histogram': dict(histogram),
+        }
+    return {'generated': time.time(), 'key_sets': key_sets, 'users': users}
+
+
+def manifest_path(summary_path):
+    return os.path.splitext(summary_path)[0] + '.manifest.json'
+
+
+def load_manifest(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('files', {})
+
+
+def aggregate_directory(directory, summary_path=LEADERBOARD_SUMMARY_PATH, workers=LEADERBOARD_WORKERS):
+    """Aggregate every results log below directory and write the summary.
+
+    Returns (summary, number of files reprocessed, number of files in total).
+    """
+    paths = [os.path.abspath(path) for path in find_results_files(directory)]
+    files, changed = map_changed_files(aggregate_file, paths, load_manifest(manifest_path(summary_path)),
+                                       'partials', workers)
+
+    summary = build_summary(entry['partials'] for entry in files.values())
+    summary['files'] = len(files)
+    write_file(summary_path, json.dumps(summary, separators=(',', ':')))
+    write_file(manifest_path(summary_path),
+               json.dumps({'version': MANIFEST_VERSION, 'files': files}, separators=(',', ':')))
+    return summary, len(changed), len(files)
+
+
+class LeaderboardSummary:
+    """The summary as seen by the results screen, reloaded when the file changes."""
+
+    def __init__(self, path=LEADERBOARD_SUMMARY_PATH):
+        self.path = path
+        self.mtime = None
+        self.summary = None
+
+    def load(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            self.summary = None
+            return None
+        if mtime != self.mtime:
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    self.summary = json.load(f)
+                self.mtime = mtime
+            except (OSError, ValueError):
+                self.summary = None
+        return self.summary
+
+    def rank_text(self, user, keys, wpm):
+        """Describe the user's standing on these keys, or None without a summary."""
+        summary = self.load()
+        if not summary:
+            return None
+        stats = summary['key_sets'].get(key_set(keys))
+        scope = "these keys"
+        if not stats:
+            stats = summary['key_sets'].get(ALL_KEYS)
+            scope = "all keys"
+        if not stats:
+            return None
+
+        board = stats['leaderboard']
+        positions = [position for position, entry in enumerate(board, 1) if entry['user'] == user]
+        below = share_below(stats['histogram'], wpm)
+        if positions and below is not None:
+            return f"Your rank: {positions[0]} of {len(board)} on {scope}, faster than {below:.0%} of sessions"
+        if positions:
+            return f"Your rank: {positions[0]} of {len(board)} on {scope}"
+        if below is not None:
+            return f"Faster than {below:.0%} of sessions on {scope}"
+        return None
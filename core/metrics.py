@@ -0,0 +1,196 @@
+"""
+Counters and histograms for watching trainer instances, in Prometheus text format.
+
+Metrics are always collected; exporting them (an HTTP endpoint on localhost
+or a periodically rewritten file) is optional. Every metric is updated from
+the Tk main loop only, so updates are plain attribute arithmetic with no
+locks; exporter threads just read the values.
+"""
+
+import functools
+import threading
+import time
+from bisect import bisect_left
+
+from config.settings import METRICS_HOST, METRICS_DUMP_INTERVAL, METRICS_LATENCY_BUCKETS
+from core.persistence import write_file
+
+PREFIX = "typing_trainer_"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+METRICS = []  # Every metric, in the order they are exported
+COLLECTORS = []  # Functions returning [(name, type, help, value)] read at export time
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = PREFIX + name
+        self.help = help_text
+        self.value = 0
+        METRICS.append(self)
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter", f"{self.name} {self.value}"]
+
+
+class Histogram:
+    """Cumulative-bucket histogram of durations in seconds."""
+
+    def __init__(self, name, help_text, buckets=METRICS_LATENCY_BUCKETS):
+        self.name = PREFIX + name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Per bucket, not cumulative; the last is +Inf
+        self.sum = 0.0
+        METRICS.append(self)
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def time(self, function):
+        """Decorator that observes how long each call of function takes."""
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.observe(time.perf_counter() - started)
+        return timed
+
+    def render(self):
+        counts = list(self.counts)  # One consistent copy of the buckets
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        total = 0
+        for bound, count in zip(self.buckets, counts):
+            total += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {total}')
+        total += counts[-1]
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {total}')
+        lines.append(f"{self.name}_sum {self.sum}")
+        lines.append(f"{self.name}_count {total}")
+        return lines
+
+
+KEYSTROKES = Counter("keystrokes_total", "Keystrokes typed, including mistakes.")
+INCORRECT_KEYSTROKES = Counter("incorrect_keystrokes_total", "Keystrokes that did not match the text.")
+SESSIONS_STARTED = Counter("sessions_started_total", "Typing sessions started.")
+SESSIONS_COMPLETED = Counter("sessions_completed_total", "Typing sessions that reached the results screen.")
+KEY_PRESS_SECONDS = Histogram("key_press_seconds", "Time spent handling one key press.")
+SENTENCE_SECONDS = Histogram("sentence_generation_seconds", "Time spent generating one sentence.")
+DICTIONARY_LOAD_SECONDS = Histogram("dictionary_load_seconds", "Time spent loading one dictionary.")
+THEME_APPLY_SECONDS = Histogram("theme_apply_seconds", "Time spent applying the theme to all widgets.")
+
+
+def record_keystroke(is_correct):
+    KEYSTROKES.inc()
+    if not is_correct:
+        INCORRECT_KEYSTROKES.inc()
+
+
+def add_collector(collector):
+    COLLECTORS.append(collector)
+
+
+def writer_collector(writer):
+    """Collector exporting the statistics of a BackgroundWriter."""
+    def collect():
+        stats = writer.get_stats()
+        values = [
+            ('writer_jobs_submitted_total', 'counter', "Jobs queued on the background writer.", stats['submitted']),
+            ('writer_jobs_completed_total', 'counter', "Jobs the background writer finished.", stats['completed']),
+            ('writer_errors_total', 'counter', "Failed background writes.", stats['errors']),
+            ('writer_blocked_puts_total', 'counter', "Submissions that waited for queue space.",
+             stats['blocked_puts']),
+            ('writer_queue_depth', 'gauge', "Jobs waiting on the background writer.", stats['queue_depth']),
+        ]
+        if 'latency_p95' in stats:
+            values.append(('writer_latency_p95_seconds', 'gauge', "95th percentile of recent write latency.",
+                           stats['latency_p95']))
+        return values
+    return collect
+
+
+def render():
+    """Return all metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    for collector in COLLECTORS:
+        for name, kind, help_text, value in collector():
+            lines += [f"# HELP {PREFIX}{name} {help_text}", f"# TYPE {PREFIX}{name} {kind}", f"{PREFIX}{name} {value}"]
+    return "\n".join(lines) + "\n"
+
+
+def make_handler():
+    # http.server takes longer to import than the rest of the app, so only servers load it
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = render().encode('utf-8')
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes every few seconds would flood the console
+
+    return MetricsHandler
+
+
+class MetricsServer:
+    """Serve /metrics over HTTP from a daemon thread."""
+
+    def __init__(self, port, host=METRICS_HOST):
+        from http.server import ThreadingHTTPServer
+        self.server = ThreadingHTTPServer((host, port), make_handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class MetricsFileDumper:
+    """Rewrite a file with the current metrics every interval seconds.
+
+    Point node_exporter's textfile collector at the file to scrape it.
+    """
+
+    def __init__(self, path, interval=METRICS_DUMP_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="metrics-dumper", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            self.dump()
+
+    def dump(self):
+        try:
+            write_file(self.path, render())
+        except OSError:
+            pass  # Try again at the next interval
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+        self.dump()  # Final values
@@ -0,0 +1,59 @@
+"""
+Process pools and incremental per-file processing shared by the batch jobs.
+
+Each file's result is cached in a manifest together with the file's size
+and mtime, so a rerun only processes the files that changed since the last
+one. When more than one file changed they are processed in a process pool.
+"""
+
+import os
+
+
+def process_pool(workers, initializer=None, initargs=()):
+    """Return a ProcessPoolExecutor whose workers are spawned, not forked."""
+    # Imported here so front ends that never start a pool load faster
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    # spawn avoids forking a process that may already hold a Tk connection
+    context = multiprocessing.get_context('spawn')
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                               initializer=initializer, initargs=initargs)
+
+
+def map_changed_files(function, paths, cached, field, workers, progress=None):
+    """Return ({path: entry}, changed paths) with entry[field] = function(path) for every file.
+
+    cached holds the entries of the last run; an entry whose size and mtime
+    still match its file is reused as it is. progress, if given, is called
+    as progress(done, total) after each changed file; an exception raised
+    from it cancels the files not yet processed.
+    """
+    files = {}
+    changed = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entry = cached.get(path)
+        if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+            files[path] = entry
+        else:
+            files[path] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, field: None}
+            changed.append(path)
+
+    def store(results):
+        for done, (path, result) in enumerate(zip(changed, results), 1):
+            files[path][field] = result
+            if progress:
+                progress(done, len(changed))
+
+    if len(changed) > 1:
+        pool = process_pool(workers)
+        try:
+            store(pool.map(function, changed, chunksize=max(1, len(changed) // 64)))
+        finally:
+            pool.shutdown(cancel_futures=True)
+    else:
+        store(map(function, changed))
+    return files, changed
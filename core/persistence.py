@@ -0,0 +1,208 @@
+"""
+Background writer that keeps file I/O off the Tk main loop.
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from config.settings import WRITER_QUEUE_SIZE, WRITER_BATCH_WINDOW, WRITER_LATENCY_SAMPLES
+
+# Job kinds
+WRITE = 'write'
+APPEND = 'append'
+CALL = 'call'
+BARRIER = 'barrier'
+STOP = 'stop'
+
+
+def write_file(path, data, append=False):
+    """Durably write (or append) data to path; replaced files are swapped in atomically."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if append:
+        with open(path, 'ab') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        return
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class BackgroundWriter:
+    """Write files from a worker thread fed by a bounded queue.
+
+    Jobs that arrive within WRITER_BATCH_WINDOW of each other are committed
+    together: repeated replacements of a file keep only the last contents
+    and appends to a file are joined, so each file is written and fsynced
+    once per batch (group commit).
+    """
+
+    def __init__(self, max_queue=WRITER_QUEUE_SIZE, batch_window=WRITER_BATCH_WINDOW):
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.batch_window = batch_window
+        self.thread = None
+        self.lock = threading.Lock()  # Guards the statistics below
+
+        self.submitted = 0
+        self.completed = 0
+        self.batches = 0
+        self.errors = 0
+        self.blocked_puts = 0  # Submissions that had to wait for queue space
+        self.max_queue_depth = 0
+        self.latencies = deque(maxlen=WRITER_LATENCY_SAMPLES)  # Seconds from submit to commit
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="background-writer", daemon=True)
+            self.thread.start()
+
+    def write(self, path, data):
+        """Replace the contents of path with data."""
+        self.submit((WRITE, path, data))
+
+    def append(self, path, data):
+        """Append data to path."""
+        self.submit((APPEND, path, data))
+
+    def call(self, function):
+        """Run a function on the writer thread, e.g. to serialize a snapshot and save it.
+
+        Functions run after the plain file writes of the same batch.
+        """
+        self.submit((CALL, function, None))
+
+    def submit(self, job):
+        if self.thread is None:
+            self.start()
+        entry = (time.perf_counter(), job)
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            # Back-pressure instead of dropping data
+            with self.lock:
+                self.blocked_puts += 1
+            self.queue.put(entry)
+        with self.lock:
+            self.submitted += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+
+    def flush(self, timeout=None):
+        """Wait until everything submitted so far is written; False on timeout."""
+        if self.thread is None:
+            return True
+        done = threading.Event()
+        try:
+            self.queue.put((time.perf_counter(), (BARRIER, done, None)), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout=None):
+        """Flush pending writes and stop the thread; False if the timeout expired."""
+        if self.thread is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        flushed = self.flush(timeout)
+        remaining = None if deadline is None else max(0, deadline - time.monotonic())
+        try:
+            self.queue.put((time.perf_counter(), (STOP, None, None)), timeout=remaining)
+        except queue.Full:
+            return False
+        self.thread.join(remaining)
+        stopped = not self.thread.is_alive()
+        if stopped:
+            self.thread = None
+        return flushed and stopped
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.batch_window
+            # Gather whatever else arrives within the batch window
+            while batch[-1][1][0] not in (BARRIER, STOP):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self.commit(batch)
+            if batch[-1][1][0] == STOP:
+                return
+
+    def commit(self, batch):
+        """Write a batch, coalescing jobs per file, then release any barrier."""
+        files = {}  # path -> [replacement contents or None, appended chunks]
+        calls = []
+        barrier = None
+        for _, (kind, target, data) in batch:
+            if kind == WRITE:
+                files[target] = [data, []]
+            elif kind == APPEND:
+                if isinstance(data, str):
+                    data = data.encode('utf-8')
+                files.setdefault(target, [None, []])[1].append(data)
+            elif kind == CALL:
+                calls.append(target)
+            elif kind == BARRIER:
+                barrier = target
+
+        errors = 0
+        for path, (contents, chunks) in files.items():
+            try:
+                if contents is not None:
+                    if isinstance(contents, str):
+                        contents = contents.encode('utf-8')
+                    write_file(path, contents + b''.join(chunks))
+                else:
+                    write_file(path, b''.join(chunks), append=True)
+            except OSError:
+                errors += 1
+        for function in calls:
+            try:
+                function()
+            except Exception:
+                errors += 1
+
+        now = time.perf_counter()
+        with self.lock:
+            self.batches += 1
+            self.errors += errors
+            for submitted_at, (kind, _, _) in batch:
+                if kind in (WRITE, APPEND, CALL):
+                    self.completed += 1
+                    self.latencies.append(now - submitted_at)
+        if barrier:
+            barrier.set()
+
+    def get_stats(self):
+        """Return counters, queue depth and write latency (seconds)."""
+        with self.lock:
+            latencies = sorted(self.latencies)
+            stats = {
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'batches': self.batches,
+                'errors': self.errors,
+                'blocked_puts': self.blocked_puts,
+                'queue_depth': self.queue.qsize(),
+                'max_queue_depth': self.max_queue_depth,
+            }
+        if latencies:
+            stats['latency_avg'] = sum(latencies) / len(latencies)
+            stats['latency_p95'] = latencies[int(0.95 * (len(latencies) - 1))]
+            stats['latency_max'] = latencies[-1]
+        return stats
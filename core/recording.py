@@ -0,0 +1,215 @@
+"""
+Compact binary recordings of every keystroke of a session.
+
+A recording is a header followed by chunks appended while the session runs:
+
+    header: magic, version, start time, seed, time limit, then the mode,
+            keys, language and lesson as length-prefixed UTF-8 strings
+    chunk:  varint keystroke count, varint body size, body
+
+A chunk body holds the keystrokes column by column: correctness flags packed
+eight to a byte, millisecond timestamps as varint deltas, then one varint
+character code per keystroke. Codes index a character table that grows as
+new characters appear, so a keystroke usually takes about three bytes.
+"""
+
+import mmap
+import os
+import struct
+
+from config.settings import RECORDINGS_DIR, RECORDING_CHUNK_KEYS
+
+RECORDING_MAGIC = b'TTKR'
+RECORDING_VERSION = 1
+RECORDING_HEADER = struct.Struct('<4sBdII')  # magic, version, start time, seed, time limit
+
+# Character codes; codes from FIRST_CODE on index the character table
+CODE_BACKSPACE = 0
+CODE_NEW_CHAR = 1  # Followed by the code point of a character not seen before
+FIRST_CODE = 2
+
+
+def encode_varint(value, out):
+    """Append value to the bytearray out as an unsigned LEB128 varint."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(data, offset):
+    """Return (value, next offset) of the varint at offset in data."""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def encode_string(text, out):
+    data = text.encode('utf-8')
+    encode_varint(len(data), out)
+    out += data
+
+
+def recording_path(start_time, seed, directory=RECORDINGS_DIR):
+    """Return a new recording's path; a random suffix keeps runs of one exam in the same second apart."""
+    return os.path.join(directory, f"{int(start_time)}-{seed or 0:08x}-{os.urandom(4).hex()}.ttr")
+
+
+class SessionRecorder:
+    """Keystroke listener that appends a session's keystrokes to a recording."""
+
+    def __init__(self, writer, directory=RECORDINGS_DIR, chunk_size=RECORDING_CHUNK_KEYS):
+        self.writer = writer
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.path = None
+        self.pending = []  # (timestamp, typed or None, is_correct) not yet written
+
+    def start(self, start_time, seed, time_limit, mode, keys, language, lesson=None):
+        """Begin a new recording; any previous one is finished first."""
+        self.finish()
+        self.path = recording_path(start_time, seed, self.directory)
+        self.start_time = start_time
+        self.last_ms = 0
+        self.codes = {}  # Character -> code
+
+        header = bytearray(RECORDING_HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION,
+                                                 start_time, seed or 0,
+                                                 min(int(time_limit), 0xFFFFFFFF)))
+        for text in (mode, keys, language, lesson or ""):
+            encode_string(text, header)
+        self.writer.write(self.path, bytes(header))
+
+    def on_keystroke(self, text, index, typed, is_correct, timestamp):
+        if self.path is None:
+            return
+        self.pending.append((timestamp, typed, is_correct))
+        if len(self.pending) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Encode the pending keystrokes as one chunk and queue it for appending."""
+        if not self.pending:
+            return
+        keystrokes, self.pending = self.pending, []
+
+        flags = bytearray((len(keystrokes) + 7) // 8)
+        times = bytearray()
+        chars = bytearray()
+        for i, (timestamp, typed, is_correct) in enumerate(keystrokes):
+            if is_correct:
+                flags[i >> 3] |= 1 << (i & 7)
+
+            # Absolute milliseconds are rounded first so deltas never drift
+            ms = max(self.last_ms, round((timestamp - self.start_time) * 1000))
+            encode_varint(ms - self.last_ms, times)
+            self.last_ms = ms
+
+            if typed is None:
+                encode_varint(CODE_BACKSPACE, chars)
+            elif typed in self.codes:
+                encode_varint(self.codes[typed], chars)
+            else:
+                self.codes[typed] = FIRST_CODE + len(self.codes)
+                encode_varint(CODE_NEW_CHAR, chars)
+                encode_varint(ord(typed[0]), chars)
+
+        body = flags + times + chars
+        chunk = bytearray()
+        encode_varint(len(keystrokes), chunk)
+        encode_varint(len(body), chunk)
+        self.writer.append(self.path, bytes(chunk + body))
+
+    def finish(self):
+        """Write the last partial chunk and stop recording."""
+        if self.path is not None:
+            self.flush()
+            self.path = None
+
+
+class RecordingReader:
+    """Read a recording without copying it: chunks are decoded straight from the mmap."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        try:
+            self.read_header()
+        except (ValueError, IndexError, struct.error):
+            self.close()
+            raise ValueError(f"Not a valid recording: {path}")
+
+    def read_header(self):
+        magic, version, self.start_time, self.seed, self.time_limit = RECORDING_HEADER.unpack_from(self.view)
+        if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+            raise ValueError("Unknown recording format")
+        offset = RECORDING_HEADER.size
+        strings = []
+        for _ in range(4):
+            size, offset = decode_varint(self.view, offset)
+            strings.append(str(self.view[offset:offset + size], 'utf-8'))
+            offset += size
+        self.mode, self.keys, self.language, lesson = strings
+        self.lesson = lesson or None
+        self.data_start = offset
+
+    def chunks(self):
+        """Yield (keystroke count, body memoryview) of every complete chunk."""
+        offset = self.data_start
+        end = len(self.view)
+        while offset < end:
+            try:
+                count, body_start = decode_varint(self.view, offset)
+                size, body_start = decode_varint(self.view, body_start)
+            except IndexError:
+                return  # Truncated chunk header
+            if body_start + size > end:
+                return  # Truncated by a crash mid-append
+            yield count, self.view[body_start:body_start + size]
+            offset = body_start + size
+
+    def keystrokes(self):
+        """Yield (seconds since start, typed character or None for backspace, is_correct)."""
+        table = []
+        ms = 0
+        for count, body in self.chunks():
+            flags_size = (count + 7) // 8
+            times_offset = flags_size
+            # Timestamps come first, so the character column starts after them
+            chars_offset = times_offset
+            for _ in range(count):
+                _, chars_offset = decode_varint(body, chars_offset)
+
+            for i in range(count):
+                delta, times_offset = decode_varint(body, times_offset)
+                ms += delta
+                code, chars_offset = decode_varint(body, chars_offset)
+                if code == CODE_BACKSPACE:
+                    typed = None
+                elif code == CODE_NEW_CHAR:
+                    code_point, chars_offset = decode_varint(body, chars_offset)
+                    typed = chr(code_point)
+                    table.append(typed)
+                else:
+                    typed = table[code - FIRST_CODE]
+                yield ms / 1000, typed, bool(body[i >> 3] & (1 << (i & 7)))
+
+    def __len__(self):
+        return sum(count for count, _ in self.chunks())
+
+    def close(self):
+        self.view.release()
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,222 @@
+"""
+Soak mode for long-running sessions.
+
+Runs the application, either idle or driven by synthetic keystrokes, and
+periodically samples Python heap usage, process RSS, the number of Tk
+widgets and pending after() jobs. The resulting report flags any metric
+that keeps growing over the run.
+"""
+
+import os
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from config.settings import (SOAK_SAMPLE_INTERVAL, SOAK_KEYS_PER_SECOND, SOAK_ERROR_RATE,
+                             SOAK_CYCLE_SECONDS, SOAK_GROWTH_TOLERANCE)
+
+# Keysyms that GUI.on_key_press handles by name rather than by event.char
+KEYSYMS = {' ': 'space', '.': 'period', ',': 'comma'}
+
+
+def read_rss_bytes():
+    """Return the resident set size of this process in bytes."""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # No procfs: fall back to the peak RSS (kilobytes on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def count_widgets(widget):
+    """Count a widget and all of its descendants."""
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def find_growth(values, tolerance=SOAK_GROWTH_TOLERANCE):
+    """Return True if a series grows (almost) monotonically beyond the tolerance."""
+    if len(values) < 3:
+        return False
+    steps = [b - a for a, b in zip(values, values[1:])]
+    increasing = sum(1 for step in steps if step > 0)
+    decreasing = sum(1 for step in steps if step < 0)
+    net_growth = values[-1] - values[0]
+    threshold = max(abs(values[0]) * tolerance, 1)
+    # A leak rises steadily; allow the odd dip caused by collection or paging
+    return net_growth > threshold and increasing >= 0.8 * len(steps) and decreasing <= len(steps) // 10
+
+
+class SoakDriver:
+    """Feed synthetic keystrokes into the GUI to simulate a user typing."""
+
+    def __init__(self, gui, keys_per_second=SOAK_KEYS_PER_SECOND, error_rate=SOAK_ERROR_RATE,
+                 cycle_seconds=SOAK_CYCLE_SECONDS, seed=None):
+        self.gui = gui
+        self.delay = max(1, int(1000 / keys_per_second))
+        self.error_rate = error_rate
+        self.cycle_seconds = cycle_seconds
+        self.random = random.Random(seed)
+        self.timer_ids = {}
+        self.session_start = 0
+        self.keystrokes = 0
+        self.sessions = 0
+
+    def start(self):
+        self.gui.register_service(self)
+        self.start_session()
+
+    def stop(self):
+        for timer_id in self.timer_ids.values():
+            try:
+                self.gui.root.after_cancel(timer_id)
+            except Exception:
+                pass
+        self.timer_ids = {}
+        self.gui.unregister_service(self)
+
+    def get_timer_ids(self):
+        return list(self.timer_ids.values())
+
+    def start_session(self):
+        """Start a freeplay session and begin typing into it."""
+        self.sessions += 1
+        self.session_start = time.time()
+        self.gui.set_time_mode("freeplay")
+        self.timer_ids['type'] = self.gui.root.after(self.delay, self.type_next)
+
+    def type_next(self):
+        """Type the next character, occasionally making and correcting a mistake."""
+        if self.cycle_seconds and time.time() - self.session_start >= self.cycle_seconds:
+            # Exercise the screen switches as a real user would
+            self.gui.show_results()
+            self.gui.show_menu()
+            self.start_session()
+            return
+
+        text = self.gui.current_text[0]
+        index = self.gui.current_index[0]
+        expected = text[index] if index < len(text) else ' '
+        roll = self.random.random()
+        if roll < self.error_rate / 2 and index > 0:
+            self.press('', 'BackSpace')
+        elif roll < self.error_rate:
+            self.press('#', 'numbersign')
+        else:
+            self.press(expected, KEYSYMS.get(expected, expected))
+        self.timer_ids['type'] = self.gui.root.after(self.delay, self.type_next)
+
+    def press(self, char, keysym):
+        self.keystrokes += 1
+        self.gui.on_key_press(SimpleNamespace(char=char, keysym=keysym))
+
+
+class SoakMonitor:
+    """Sample resource usage of a running GUI and report steady growth."""
+
+    def __init__(self, gui, duration, interval=SOAK_SAMPLE_INTERVAL, driver=None):
+        self.gui = gui
+        self.root = gui.root
+        self.duration = duration
+        self.interval_ms = max(1, int(interval * 1000))
+        self.driver = driver
+        self.samples = []
+        self.timer_ids = {}
+        self.start_time = None
+        self.baseline_snapshot = None
+        self.last_snapshot = None
+
+    def start(self):
+        """Take the baseline sample and schedule the periodic ones."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+        self.start_time = time.time()
+        self.gui.register_service(self)
+        if self.driver:
+            self.driver.start()
+        self.sample()
+        self.baseline_snapshot = self.last_snapshot
+        self.timer_ids['sample'] = self.root.after(self.interval_ms, self.tick)
+        self.timer_ids['finish'] = self.root.after(int(self.duration * 1000), self.finish)
+
+    def get_timer_ids(self):
+        return list(self.timer_ids.values())
+
+    def tick(self):
+        self.sample()
+        self.timer_ids['sample'] = self.root.after(self.interval_ms, self.tick)
+
+    def sample(self):
+        """Record one sample of all tracked metrics."""
+        self.last_snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        traced_current, traced_peak = tracemalloc.get_traced_memory()
+        self.samples.append({
+            'elapsed': time.time() - self.start_time,
+            'traced_bytes': traced_current,
+            'rss_bytes': read_rss_bytes(),
+            'widgets': count_widgets(self.root),
+            'after_jobs': len(self.root.tk.call('after', 'info')),
+            'tcl_commands': len(self.root.tk.call('info', 'commands')),
+            'stats_timer_ids': len(self.gui.stats_manager.get_timer_ids()),
+        })
+
+    def finish(self):
+        """Take a final sample and close the application."""
+        self.sample()
+        if self.driver:
+            self.driver.stop()
+        self.gui.unregister_service(self)
+        self.timer_ids = {}
+        self.gui.exit_application()
+
+    def build_report(self):
+        """Return a plain-text report of the collected samples."""
+        lines = [f"Soak report: {len(self.samples)} samples over "
+                 f"{self.samples[-1]['elapsed'] if self.samples else 0:.0f}s"]
+        if self.driver:
+            lines.append(f"Driven: {self.driver.keystrokes} keystrokes in {self.driver.sessions} sessions")
+        else:
+            lines.append("Idle run (no synthetic input)")
+        lines.append("")
+
+        flagged = []
+        for metric in ('traced_bytes', 'rss_bytes', 'widgets', 'after_jobs', 'tcl_commands', 'stats_timer_ids'):
+            values = [sample[metric] for sample in self.samples]
+            if not values:
+                continue
+            growing = find_growth(values)
+            if growing:
+                flagged.append(metric)
+            status = "GROWING" if growing else "ok"
+            lines.append(f"{metric:<16} first={values[0]:<12} last={values[-1]:<12} "
+                         f"max={max(values):<12} {status}")
+
+        lines.append("")
+        if flagged:
+            lines.append("Possible leaks: " + ", ".join(flagged))
+        else:
+            lines.append("No monotonic growth detected")
+
+        if self.baseline_snapshot and self.last_snapshot:
+            lines.append("")
+            lines.append("Top allocation growth since start:")
+            for stat in self.last_snapshot.compare_to(self.baseline_snapshot, 'lineno')[:10]:
+                lines.append(f"  {stat}")
+        return "\n".join(lines)
+
+    def write_report(self, path=None):
+        """Print the report and optionally save it to a file."""
+        report = self.build_report()
+        print(report)
+        if path:
+            with open(path, 'w') as f:
+                f.write(report + "\n")
+        return report
@@ -4,6 +4,14 @@ Stats manager for tracking typing performance.
 
 import time
 
+from config.settings import TIME_MODES, USER_NAME
+
+def time_limit_for(mode, custom_time=0):
+    """Return the time limit in seconds of a time mode (0 means no limit)."""
+    if mode == "custom":
+        return custom_time
+    return TIME_MODES.get(mode, 0)
+
 class StatsManager:
     def __init__(self, gui_elements):
         self.gui_elements = gui_elements
@@ -11,8 +19,9 @@ class StatsManager:
         self.correct_keystrokes = 0
         self.chars_typed = 0
         self.start_time = time.time()
-        self.timer_ids = []
+        self.timer_ids = {}  # One pending after() id per periodic job
         self.time_limit = 0  # 0 means no time limit (freeplay)
+        self.samples = []  # (elapsed seconds, wpm, accuracy) once per timer tick
         self.gui = gui_elements.get('gui')  # Reference to GUI object
     
     def reset_stats(self, time_limit=0):
@@ -21,6 +30,7 @@ class StatsManager:
         self.chars_typed = 0
         self.start_time = time.time()
         self.time_limit = time_limit
+        self.samples = []
     
     def register_keystroke(self, is_correct):
         self.total_keystrokes += 1
@@ -30,28 +40,42 @@ class StatsManager:
     
     def update_timer(self):
         elapsed_time = time.time() - self.start_time
+        self.record_sample(elapsed_time)
         
         # Check if time limit is set and has been reached
-        if self.time_limit > 0 and elapsed_time >= self.time_limit:
+        if self.is_time_up(elapsed_time):
             # Time's up - show results screen
             if self.gui:
                 self.gui.show_results()
             return
             
+        self.gui_elements['time_label'].config(text=self.time_text(elapsed_time))
+        self.schedule('timer', self.update_timer)
+    
+    def time_text(self, elapsed_time):
+        """Return the clock shown while typing: a countdown, or elapsed time in freeplay."""
         # If time limit is set, show countdown
         if self.time_limit > 0:
             remaining = max(0, self.time_limit - elapsed_time)
             minutes = int(remaining // 60)
             seconds = int(remaining % 60)
-            time_str = f"Time: {minutes:02d}:{seconds:02d}"
         else:  # Show elapsed time for freeplay
             minutes = int(elapsed_time // 60)
             seconds = int(elapsed_time % 60)
-            time_str = f"Time: {minutes:02d}:{seconds:02d}"
-        
-        self.gui_elements['time_label'].config(text=time_str)
-        timer_id = self.gui_elements['root'].after(1000, self.update_timer)
-        self.timer_ids.append(timer_id)
+        return f"Time: {minutes:02d}:{seconds:02d}"
+    
+    def is_time_up(self, elapsed_time=None):
+        """Return True once a timed session has run out of time."""
+        if elapsed_time is None:
+            elapsed_time = self.get_elapsed_time()
+        return self.time_limit > 0 and elapsed_time >= self.time_limit
+    
+    def record_sample(self, elapsed_time):
+        """Store the current WPM and accuracy for the results chart."""
+        self.samples.append((elapsed_time, self.calculate_wpm(), self.calculate_accuracy()))
+    
+    def get_samples(self):
+        return self.samples
     
     def calculate_wpm(self):
         """Calculate words per minute"""
@@ -80,32 +104,73 @@ class StatsManager:
         self.gui_elements['wpm_label'].config(text=f"WPM: {wpm}")
         self.gui_elements['accuracy_label'].config(text=f"Accuracy: {accuracy:.1f}%")
         
-        timer_id = self.gui_elements['root'].after(1000, self.update_stats)
-        self.timer_ids.append(timer_id)
+        self.schedule('stats', self.update_stats)
+    
+    def schedule(self, name, callback, delay=1000):
+        """Schedule a periodic job, replacing any pending call of the same job.
+        
+        Keeping a single id per job stops timer_ids from growing for the whole
+        session and prevents update_stats() calls made outside the timer loop
+        (e.g. on backspace) from spawning extra parallel update chains.
+        """
+        root = self.gui_elements['root']
+        previous_id = self.timer_ids.get(name)
+        if previous_id is not None:
+            try:
+                root.after_cancel(previous_id)
+            except Exception:
+                pass
+        self.timer_ids[name] = root.after(delay, callback)
     
     def get_timer_ids(self):
-        return self.timer_ids
+        return list(self.timer_ids.values())
         
     def cancel_timers(self):
         """Cancel all active timers in the stats manager"""
-        for timer_id in self.timer_ids:
+        for timer_id in self.timer_ids.values():
             try:
                 self.gui_elements['root'].after_cancel(timer_id)
             except Exception:
                 pass
-        self.timer_ids = []
+        self.timer_ids = {}
+
+    def remove_keystroke(self, was_correct):
+        """Take back a keystroke that was deleted with backspace."""
+        self.total_keystrokes -= 1
+        if was_correct:
+            self.correct_keystrokes -= 1
 
     def update_stats_based_on_color(self, color):
         """Update statistics based on the color of the deleted letter."""
         if color.lower() in ("red", "#ff4444"):
-            self.total_keystrokes -= 1
+            self.remove_keystroke(False)
         elif color.lower() in ("green", "#00cc00"):
-            self.total_keystrokes -= 1
-            self.correct_keystrokes -= 1
+            self.remove_keystroke(True)
         # Add more color-based logic if needed
 
         self.update_stats()
         
+    def build_record(self, wpm, accuracy, elapsed_time, session):
+        """Return the results log entry of a finished session.
+        
+        session holds what the front end knows about it: mode, keys,
+        language, lesson and seed.
+        """
+        return {
+            'user': USER_NAME,
+            'timestamp': time.time(),
+            'mode': session['mode'],
+            'time_limit': self.time_limit,
+            'keys': session['keys'],
+            'language': session['language'],
+            'lesson': session['lesson'],
+            'seed': session['seed'],
+            'wpm': wpm,
+            'accuracy': round(accuracy, 2),
+            'elapsed': round(elapsed_time, 2),
+            'keystrokes': self.total_keystrokes,
+        }
+        
     def get_elapsed_time(self):
         """Get the elapsed time since starting."""
         return time.time() - self.start_time
\ No newline at end of file
@@ -3,69 +3,143 @@ Text generator for typing exercises.
 """
 
 import random
-from config.settings import MIN_TEXT_LEN
+from config.settings import MIN_TEXT_LEN, DEFAULT_LANGUAGE, DRILL_WORDS_PER_SENTENCE
+from core.dictionary_registry import DictionaryRegistry, can_form, normalize
+from core.curriculum import load_curriculum, lessons_hash
+from core.text_source import FileTextSource
+from core.exercise_cache import ExerciseCache, exercise_key
+from core.metrics import SENTENCE_SECONDS
 
 class TextGenerator:
-    def __init__(self):
-        self.word_list = self.load_english_words()
-        
-    def load_english_words(self):
-        """Load a list of English words from a file or use a predefined list."""
-        try:
-            with open('./data/Oxford3000.txt', 'r') as f:
-                return [word.strip().lower() for word in f if word.strip().isalpha()]
-        except:
-            # Fallback to a basic word list
-            basic_words = ["the", "be", "to", "of", "and", "a", "in", "that", "have", 
-                "it", "for", "not", "on", "with", "he", "as", "you", "do", "at", 
-                "this", "but", "his", "by", "from", "they", "we", "say", "her", 
-                "she", "or", "an", "will", "my", "one", "all", "would", "there"]
-            return basic_words
+    def __init__(self, language=DEFAULT_LANGUAGE, writer=None):
+        # Dictionaries are loaded on first use, not at startup
+        self.registry = DictionaryRegistry()
+        self.language = language
+        self.text_source = None  # Optional source of real text (e.g. a book)
+        self.writer = writer  # Optional BackgroundWriter used by text sources
+        self.drill_scheduler = None  # Set to mix due review words into sentences
+        self.lesson = None  # Curriculum lesson whose word pool replaces the key filter
+        self.curricula = {}  # Language -> loaded Curriculum
+        self.exercise_cache = ExerciseCache(writer=writer)  # Seeded sentences
+    
+    @property
+    def dictionary(self):
+        return self.registry.get(self.language)
+    
+    @property
+    def word_list(self):
+        return self.dictionary.words
+    
+    def get_languages(self):
+        return self.registry.languages()
+    
+    def set_language(self, language):
+        """Switch dictionaries; already loaded ones are reused as they are."""
+        self.registry.get(language)
+        self.language = language
+        if self.lesson:
+            self.lesson = self.get_curriculum().get(self.lesson.name)
+    
+    def has_curriculum(self, language=None):
+        """Whether the curriculum of a language (default: the current one) is loaded."""
+        return (language or self.language) in self.curricula
+    
+    def add_curriculum(self, language, curriculum):
+        """Store a curriculum loaded elsewhere, e.g. on a worker thread."""
+        self.curricula[language] = curriculum
+    
+    def get_curriculum(self):
+        """Return the curriculum of the current language, building it on first use."""
+        if self.language not in self.curricula:
+            self.curricula[self.language] = load_curriculum(self.dictionary)
+        return self.curricula[self.language]
+    
+    def set_lesson(self, name):
+        """Practise a curriculum lesson, or pass None to go back to free key selection."""
+        self.lesson = self.get_curriculum().get(name) if name else None
+    
+    def open_text_file(self, path):
+        """Practise on consecutive chunks of a text file instead of random words."""
+        self.set_text_source(FileTextSource(path, writer=self.writer))
+    
+    def set_text_source(self, source):
+        """Practise on an opened text source (e.g. a CodeTextSource built in the background)."""
+        self.close_text_source()
+        self.text_source = source
+    
+    def close_text_source(self):
+        """Go back to generating sentences from the dictionary."""
+        if self.text_source:
+            self.text_source.close()
+            self.text_source = None
     
     def find_english_words(self, keys_to_use):
-        """Find English words that can be formed using the given letters."""
-        valid_words = []
-        keys_to_use = ''.join(keys_to_use).lower()
+        """Find words of the current language that can be formed using the given letters."""
+        return self.dictionary.find_words(keys_to_use)
+    
+    def get_review_words(self, keys_to_use):
+        """Return due drill words that can be typed with the given keys."""
+        if not self.drill_scheduler:
+            return []
+        # The set test rejects most words cheaply before can_form counts letters
+        letters = set(normalize(''.join(keys_to_use)))
+        accept = lambda word: letters.issuperset(word) and can_form(word, keys_to_use)
+        return self.drill_scheduler.due_words(DRILL_WORDS_PER_SENTENCE, accept=accept,
+                                              key=''.join(sorted(keys_to_use)))
+    
+    @SENTENCE_SECONDS.time
+    def create_english_sentence(self, keys_to_use, max_length=180, rng=None, seed=None):
+        """Create a sentence from English words that can be formed using the given letters.
         
-        for word in self.word_list:
-            # Skip words that are too long
-            if len(word) > len(keys_to_use):
-                continue
-                
-            # Check if the word can be formed using the available letters
-            letter_counts = {}
-            
-            # Count available letters
-            for letter in keys_to_use:
-                letter_counts[letter] = letter_counts.get(letter, 0) + 1
-            
-            # Check if word can be formed
-            can_form = True
-            for letter in word:
-                if letter not in letter_counts or letter_counts[letter] <= 0:
-                    can_form = False
-                    break
-                letter_counts[letter] -= 1
-            
-            if can_form and len(word) >= 3:  # Only include words with 3+ letters
-                valid_words.append(word)
+        Pass a random.Random as rng to make the sequence of sentences reproducible,
+        or a seed (int or str) to get one exact sentence; seeded sentences are
+        served from the exercise cache. A seeded sentence is the same for
+        everyone, so it ignores the text source and the review words, which
+        depend on the user's own files and history.
+        """
+        if seed is None:
+            if self.text_source:
+                return self.text_source.next_chunk(max_length)
+            return self.generate_sentence(keys_to_use, max_length, rng or random)
         
-        return valid_words
+        key = self.exercise_key(keys_to_use, max_length, seed)
+        sentence = self.exercise_cache.get(key)
+        if sentence is None:
+            sentence = self.generate_sentence(keys_to_use, max_length, random.Random(seed), review=False)
+            self.exercise_cache.put(key, sentence)
+        return sentence
+    
+    def exercise_key(self, keys_to_use, max_length, seed):
+        """Cache address of a seeded sentence: everything that decides its text."""
+        lesson = [self.lesson.name, lessons_hash()] if self.lesson else None
+        return exercise_key(self.dictionary.content_hash, lesson, ''.join(sorted(keys_to_use)), seed, max_length)
     
-    def create_english_sentence(self, keys_to_use, max_length=180):
-        """Create a sentence from English words that can be formed using the given letters."""
-        valid_words = self.find_english_words(keys_to_use)
+    def generate_sentence(self, keys_to_use, max_length, rng, review=True):
+        """Build one sentence from the lesson or dictionary words, drawing from rng.
         
-        if not valid_words:
-            # If no valid words found, return a simple message
-            return "No valid English words found with these letters"
+        With review, due drill words are mixed in when drill mode is on.
+        """
+        if self.lesson:
+            # Precomputed pool; no dictionary filtering at runtime
+            next_word = lambda: self.lesson.next_word(rng)
+        else:
+            valid_words = self.find_english_words(keys_to_use)
+            
+            if not valid_words:
+                # If no valid words found, return a simple message
+                return f"No valid {self.language} words found with these letters"
+            next_word = lambda: rng.choice(valid_words)
+        
+        # Leave room for review words, which are mixed in at random positions
+        review_words = self.get_review_words(keys_to_use) if review else []
+        fresh_length = max_length - sum(len(word) + 1 for word in review_words)
         
         sentence = ""
         current_length = 0
         
-        while current_length < max_length and valid_words:
-            word = random.choice(valid_words)
-            if current_length + len(word) + 1 <= max_length:  # +1 for space
+        while current_length < fresh_length:
+            word = next_word()
+            if current_length + len(word) + 1 <= fresh_length:  # +1 for space
                 if sentence:
                     sentence += " " + word
                     current_length += len(word) + 1
@@ -74,6 +148,12 @@ class TextGenerator:
                     current_length += len(word)
             else:
                 break
+        
+        if review_words:
+            words = sentence.split()
+            for word in review_words:
+                words.insert(rng.randint(0, len(words)), word)
+            sentence = " ".join(words)
         sentence += " "
         
         return sentence
\ No newline at end of file
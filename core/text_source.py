@@ -0,0 +1,273 @@
+"""
+Paged practice text read lazily from large user-supplied files.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_right
+
+from config.settings import USER_DATA_DIR, TEXT_INDEX_BLOCK, TEXT_WINDOW_FACTOR
+from core.persistence import write_file
+
+INDEX_MAGIC = b'TTIX'
+INDEX_VERSION = 1
+# magic, version, file size, file mtime (ns), block size, total lines, entries
+INDEX_HEADER = struct.Struct('<4sHQQIQQ')
+
+WORD_PATTERN = re.compile(rb'\S+')
+PARAGRAPH_BREAK = re.compile(rb'\n[ \t\r\f\v]*\n')  # A blank line
+
+# Typographic characters mapped to what can be typed on a plain keyboard
+TYPOGRAPHIC = str.maketrans({
+    '\u2018': "'", '\u2019': "'", '\u201c': '"', '\u201d': '"',
+    '\u2013': '-', '\u2014': '-', '\u2026': '...', '\u00a0': ' ', '\ufeff': '',
+})
+
+
+def decode_word(raw):
+    return raw.decode('utf-8', errors='replace').translate(TYPOGRAPHIC)
+
+
+def split_token(raw, max_length):
+    """Return (piece, bytes used) for the head of a token longer than max_length.
+
+    The cut never falls inside a UTF-8 sequence.
+    """
+    cut = min(len(raw), max_length)
+    while True:
+        while 0 < cut < len(raw) and raw[cut] & 0xC0 == 0x80:
+            cut -= 1  # Back off to the start of a character
+        piece = decode_word(raw[:cut])
+        if len(piece) <= max_length or cut <= 1:
+            return piece, max(1, cut)
+        cut -= 1  # The typographic mapping made the piece longer
+
+
+class FileTextSource:
+    """Serve consecutive chunks of a text file without loading it into memory.
+
+    The file is memory-mapped; only the small window needed for the next chunk
+    is ever copied into Python objects. A sparse index of line offsets (one
+    entry per block of the file) is built on first open and cached next to the
+    bookmarks in the user data directory. It gives the current line for the
+    progress display and lets a bookmark survive edits to the file.
+    """
+
+    kind = 'text'
+
+    def __init__(self, path, data_dir=USER_DATA_DIR, writer=None):
+        self.path = os.path.abspath(path)
+        self.data_dir = data_dir
+        self.writer = writer  # Optional BackgroundWriter for bookmark and index saves
+        self.bookmark_path = os.path.join(data_dir, 'bookmarks.json')
+
+        stat = os.stat(self.path)
+        if stat.st_size == 0:
+            raise ValueError(f"{os.path.basename(self.path)} is empty")
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+
+        self.file = open(self.path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if not WORD_PATTERN.search(self.map):
+            self.close()
+            raise ValueError(f"{os.path.basename(self.path)} contains no text")
+
+        self.block = TEXT_INDEX_BLOCK
+        self.total_lines, self.line_numbers, self.line_offsets = self.load_index()
+        self.bookmarks = self.read_bookmarks()
+        self.position = self.load_bookmark()
+
+    @property
+    def name(self):
+        return os.path.basename(self.path)
+
+    def index_path(self):
+        digest = hashlib.sha1(self.path.encode('utf-8')).hexdigest()
+        return os.path.join(self.data_dir, 'text_index', digest + '.idx')
+
+    def load_index(self):
+        """Return (total lines, line numbers, offsets), rebuilding the cache if stale."""
+        try:
+            with open(self.index_path(), 'rb') as f:
+                header = f.read(INDEX_HEADER.size)
+                magic, version, size, mtime_ns, block, total_lines, count = INDEX_HEADER.unpack(header)
+                if (magic, version, size, mtime_ns, block) == (INDEX_MAGIC, INDEX_VERSION, self.size,
+                                                                self.mtime_ns, self.block):
+                    line_numbers = array('Q')
+                    line_numbers.fromfile(f, count)
+                    offsets = array('Q')
+                    offsets.fromfile(f, count)
+                    return total_lines, line_numbers, offsets
+        except (OSError, struct.error, EOFError):
+            pass
+
+        index = self.build_index()
+        self.save_index(*index)
+        return index
+
+    def count_newlines(self, start, end):
+        """Count newlines in a byte range, copying at most one block at a time."""
+        count = 0
+        for position in range(start, end, self.block):
+            count += self.map[position:min(end, position + self.block)].count(b'\n')
+        return count
+
+    def build_index(self):
+        """Record the first line start after every block boundary of the file.
+
+        Newlines are counted with bytes.count on block-sized slices, so the
+        scan runs at C speed and never holds more than one block in memory.
+        """
+        line_numbers = array('Q', [0])
+        offsets = array('Q', [0])
+        position = 0
+        lines = 0
+        while position + self.block < self.size:
+            newline = self.map.find(b'\n', position + self.block)
+            if newline < 0:
+                break
+            lines += self.count_newlines(position, newline + 1)
+            position = newline + 1
+            if position < self.size:
+                line_numbers.append(lines)
+                offsets.append(position)
+
+        lines += self.count_newlines(position, self.size)
+        if self.map[self.size - 1:self.size] != b'\n':
+            lines += 1  # Last line without a trailing newline
+        return lines, line_numbers, offsets
+
+    def save_index(self, total_lines, line_numbers, offsets):
+        data = (INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, self.size, self.mtime_ns,
+                                  self.block, total_lines, len(offsets))
+                + line_numbers.tobytes() + offsets.tobytes())
+        if self.writer:
+            self.writer.write(self.index_path(), data)
+            return
+        try:
+            write_file(self.index_path(), data)
+        except OSError:
+            pass  # The index is only a cache
+
+    def line_offset(self, line_number):
+        """Return the byte offset where the given (0-based) line starts."""
+        line_number = max(0, min(line_number, self.total_lines - 1))
+        entry = bisect_right(self.line_numbers, line_number) - 1
+        position = self.line_offsets[entry]
+        for _ in range(line_number - self.line_numbers[entry]):
+            position = self.map.find(b'\n', position) + 1
+        return position
+
+    def line_number(self, offset):
+        """Return the (0-based) line containing the given byte offset."""
+        entry = bisect_right(self.line_offsets, offset) - 1
+        return self.line_numbers[entry] + self.count_newlines(self.line_offsets[entry], offset)
+
+    def progress(self):
+        """Return (current line, total lines) for display."""
+        return min(self.line_number(self.position) + 1, self.total_lines), self.total_lines
+
+    def next_chunk(self, max_length):
+        """Return the next run of words up to max_length characters.
+
+        A chunk never runs past the end of a paragraph. When it fills up it
+        ends at the last line break inside it, if that keeps it at least half
+        full, so chunks of hard-wrapped text end where its lines do. A token
+        longer than max_length is split across chunks.
+        """
+        while True:
+            if self.position >= self.size:
+                self.position = 0  # Start the book again
+
+            window_end = min(self.size, self.position + max_length * TEXT_WINDOW_FACTOR)
+            words = []
+            length = 0
+            end = self.position
+            line_break = None  # (words, length, end) at the last line break inside the chunk
+            restart = None
+            for match in WORD_PATTERN.finditer(self.map, self.position, window_end):
+                if words:
+                    gap = self.map[end:match.start()]
+                    if b'\n' in gap:
+                        if PARAGRAPH_BREAK.search(gap):
+                            break
+                        line_break = (len(words), length, end)
+
+                raw = match.group()
+                if len(raw) > max_length and len(decode_word(raw)) > max_length:
+                    if not words:
+                        piece, used = split_token(raw, max_length)
+                        words.append(piece)
+                        end = match.start() + used
+                    break
+
+                # A word touching the window edge may be cut in half
+                if match.end() == window_end and window_end < self.size:
+                    if not words:
+                        restart = match.start()  # Read it again from a window starting at the word
+                    break
+
+                word = decode_word(raw)
+                if not word:
+                    end = match.end()
+                    continue
+                if words and length + len(word) + 1 > max_length:
+                    if line_break and line_break[1] >= max_length // 2:
+                        del words[line_break[0]:]
+                        end = line_break[2]
+                    break
+                words.append(word)
+                length += len(word) + (1 if len(words) > 1 else 0)
+                end = match.end()
+
+            if words:
+                self.position = end
+                break
+            # A window without words (e.g. a long run of whitespace) is skipped whole
+            self.position = restart if restart is not None else window_end
+
+        self.save_bookmark()
+        return " ".join(words) + " "
+
+    def load_bookmark(self):
+        """Return the saved position for this file.
+
+        If the file changed since, practice resumes at the bookmarked line.
+        """
+        bookmark = self.bookmarks.get(self.path)
+        if not bookmark:
+            return 0
+        if bookmark.get('size') == self.size and bookmark.get('mtime_ns') == self.mtime_ns:
+            return min(int(bookmark.get('offset', 0)), self.size)
+        return self.line_offset(int(bookmark.get('line', 0)))
+
+    def read_bookmarks(self):
+        try:
+            with open(self.bookmark_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_bookmark(self):
+        self.bookmarks[self.path] = {'offset': self.position, 'line': self.line_number(self.position),
+                                     'size': self.size, 'mtime_ns': self.mtime_ns}
+        data = json.dumps(self.bookmarks)
+        if self.writer:
+            self.writer.write(self.bookmark_path, data)
+            return
+        try:
+            write_file(self.bookmark_path, data)
+        except OSError:
+            pass
+
+    def close(self):
+        if hasattr(self, 'bookmarks'):
+            self.save_bookmark()
+        self.map.close()
+        self.file.close()
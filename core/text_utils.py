@@ -5,20 +5,26 @@ Core text utilities for generating words and sentences.
 import random
 from config.settings import MIN_WORD_SIZE, MAX_WORD_SIZE, MIN_TEXT_LEN
 
-def create_word(keys):
+def create_word(keys, rng=None):
     """Create a random word using the provided keys."""
-    word_len = random.randint(MIN_WORD_SIZE, MAX_WORD_SIZE)
-    word = ''.join(random.choice(keys) for _ in range(word_len))
+    rng = rng or random
+    word_len = rng.randint(MIN_WORD_SIZE, MAX_WORD_SIZE)
+    word = ''.join(rng.choice(keys) for _ in range(word_len))
     return word
 
 
-def create_sentence(keys: str):
-    """Create a random sentence using the provided keys."""
+def create_sentence(keys: str, seed=None, rng=None):
+    """Create a random sentence using the provided keys.
+    
+    A seed or a random.Random instance makes the sentence reproducible.
+    """
+    if rng is None:
+        rng = random if seed is None else random.Random(seed)
     text = ''
     text_len = 0
     
     while text_len < MIN_TEXT_LEN:
-        word = create_word(keys)
+        word = create_word(keys, rng)
         text += (word + ' ')
         text_len += len(word)
 
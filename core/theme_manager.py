@@ -2,6 +2,8 @@
 Theme manager for handling application appearance.
 """
 
+from core.metrics import THEME_APPLY_SECONDS
+
 class ThemeManager:
     def __init__(self, root):
         self.root = root
@@ -13,7 +15,8 @@ class ThemeManager:
                 "button_bg": "#f0f0f0",
                 "button_fg": "#000000",
                 "correct": "#008800",
-                "incorrect": "#ff0000"
+                "incorrect": "#ff0000",
+                "ghost": "#c8c8ff"
             },
             "dark": {
                 "bg": "#1e1e1e",
@@ -21,7 +24,8 @@ class ThemeManager:
                 "button_bg": "#2a2a2a",
                 "button_fg": "#ffffff",
                 "correct": "#00cc00",
-                "incorrect": "#ff4444"
+                "incorrect": "#ff4444",
+                "ghost": "#3c3c78"
             }
         }
         
@@ -40,6 +44,7 @@ class ThemeManager:
         """Get the initial background color to use for new frames."""
         return self.get_current_theme()["bg"]
     
+    @THEME_APPLY_SECONDS.time
     def apply_theme(self, gui_elements):
         current_theme = self.get_current_theme()
         button_text = "Light Mode" if self.is_dark_mode else "Dark Mode"
@@ -54,7 +59,7 @@ class ThemeManager:
         self.root.config(bg=current_theme["bg"])
         
         # Apply theme to main frames
-        for frame_name in ['menu_frame', 'game_frame', 'results_frame', 'custom_keys_frame', 'main_menu_frame', 'custom_time_frame']:
+        for frame_name in ['menu_frame', 'game_frame', 'results_frame', 'custom_keys_frame', 'main_menu_frame', 'custom_time_frame', 'lessons_frame']:
             if frame_name in gui_elements:
                 gui_elements[frame_name].config(bg=current_theme["bg"])
         
@@ -112,6 +117,13 @@ class ThemeManager:
                         elif isinstance(child, gui_elements['tk'].Button):
                             child.config(bg=current_theme["button_bg"], fg=current_theme["button_fg"])
         
+        if 'results_chart' in gui_elements:
+            gui_elements['results_chart'].apply_theme(current_theme)
+        
+        for name in ('game_heatmap', 'results_heatmap'):
+            if name in gui_elements:
+                gui_elements[name].apply_theme(current_theme)
+        
         if 'letter_frames' in gui_elements:
             gui_elements['letter_frames'].config(bg=current_theme["bg"])
             # Update letter display colors while preserving correct/incorrect states
@@ -0,0 +1,148 @@
+"""
+Watchdog that reports where the Tk main loop gets blocked.
+"""
+
+import os
+import sys
+import threading
+import time
+import traceback
+
+from config.settings import WATCHDOG_THRESHOLD_MS, WATCHDOG_HEARTBEAT_MS, WATCHDOG_STACK_DEPTH
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def find_call_site(frame):
+    """Return 'file:line in function' for the innermost frame of our own code."""
+    innermost = None
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if innermost is None:
+            innermost = frame
+        if filename.startswith(PROJECT_DIR + os.sep) and os.sep + 'watchdog.py' not in filename:
+            return f"{os.path.relpath(filename, PROJECT_DIR)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    if innermost is None:
+        return "<idle>"
+    return f"{innermost.f_code.co_filename}:{innermost.f_lineno} in {innermost.f_code.co_name}"
+
+
+class MainloopWatchdog:
+    """Detect main loop stalls from a background thread.
+
+    The main loop posts a heartbeat through root.after; when the watchdog
+    thread sees no heartbeat for longer than the threshold it samples the
+    main thread's stack with sys._current_frames and attributes the stall
+    to the innermost frame of the application's own code.
+    """
+
+    def __init__(self, gui, threshold_ms=WATCHDOG_THRESHOLD_MS, heartbeat_ms=WATCHDOG_HEARTBEAT_MS):
+        self.gui = gui
+        self.root = gui.root
+        self.threshold = threshold_ms / 1000
+        self.heartbeat_ms = heartbeat_ms
+        self.main_thread_id = threading.get_ident()
+        self.timer_ids = {}
+        self.thread = None
+        self.stop_event = threading.Event()
+
+        # Written by the main thread, read by the watchdog thread
+        self.last_beat = time.monotonic()
+        self.beats = 0
+
+        # Owned by the watchdog thread
+        self.stall_beat = None  # Beat count during which the current stall began
+        self.stall_sites = []
+        self.stall_stack = None
+        self.stalls = {}  # Call site -> {'count', 'total', 'max', 'stack'}
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Start the heartbeat (as a GUI service) and the watching thread."""
+        self.gui.register_service(self)
+        self.beat()
+        self.root.bind("<Destroy>", self.on_destroy, add="+")
+        self.thread = threading.Thread(target=self.run, name="mainloop-watchdog", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def on_destroy(self, event):
+        # Without a main loop there are no heartbeats; don't report that as a stall
+        if event.widget is self.root:
+            self.gui.unregister_service(self)
+            self.stop()
+
+    def get_timer_ids(self):
+        return list(self.timer_ids.values())
+
+    def beat(self):
+        self.last_beat = time.monotonic()
+        self.beats += 1
+        self.timer_ids['beat'] = self.root.after(self.heartbeat_ms, self.beat)
+
+    def run(self):
+        expected_gap = self.heartbeat_ms / 1000
+        interval = max(0.005, self.threshold / 4)
+        while not self.stop_event.wait(interval):
+            beats, last_beat = self.beats, self.last_beat
+            blocked = time.monotonic() - last_beat - expected_gap
+
+            if self.stall_beat is not None and beats != self.stall_beat:
+                # The main loop is running again: the stall lasted until this beat
+                self.finish_stall(last_beat)
+            if blocked > self.threshold:
+                self.sample(beats, last_beat)
+
+    def sample(self, beats, last_beat):
+        frame = sys._current_frames().get(self.main_thread_id)
+        if frame is None:
+            return
+        if self.stall_beat is None:
+            self.stall_beat = beats
+            self.stall_start = last_beat
+            self.stall_sites = []
+            self.stall_stack = ''.join(traceback.format_stack(frame, limit=WATCHDOG_STACK_DEPTH))
+        self.stall_sites.append(find_call_site(frame))
+
+    def finish_stall(self, resumed_at):
+        duration = resumed_at - self.stall_start - self.heartbeat_ms / 1000
+        # Blame the site seen most often while the loop was blocked
+        site = max(set(self.stall_sites), key=self.stall_sites.count)
+        with self.lock:
+            stats = self.stalls.setdefault(site, {'count': 0, 'total': 0.0, 'max': 0.0, 'stack': self.stall_stack})
+            stats['count'] += 1
+            stats['total'] += duration
+            if duration > stats['max']:
+                stats['max'] = duration
+                stats['stack'] = self.stall_stack
+        print(f"[watchdog] main loop blocked for {duration * 1000:.0f} ms in {site}", file=sys.stderr)
+        self.stall_beat = None
+
+    def build_report(self):
+        """Return a plain-text summary of all stalls, worst total first."""
+        with self.lock:
+            stalls = sorted(self.stalls.items(), key=lambda item: item[1]['total'], reverse=True)
+        if not stalls:
+            return f"Watchdog: no main loop stalls over {self.threshold * 1000:.0f} ms"
+
+        lines = [f"Watchdog: main loop stalls over {self.threshold * 1000:.0f} ms", ""]
+        for site, stats in stalls:
+            lines.append(f"{stats['count']:>5}x  total {stats['total'] * 1000:>8.0f} ms  "
+                         f"max {stats['max'] * 1000:>6.0f} ms  {site}")
+        worst_site, worst = max(stalls, key=lambda item: item[1]['max'])
+        lines += ["", f"Stack of the longest stall ({worst['max'] * 1000:.0f} ms in {worst_site}):", worst['stack']]
+        return "\n".join(lines)
+
+    def write_report(self, path=None):
+        report = self.build_report()
+        print(report, file=sys.stderr)
+        if path:
+            with open(path, 'w') as f:
+                f.write(report + "\n")
+        return report
@@ -2,13 +2,142 @@
 Entry point for the Typing Trainer application.
 """
 
-from ui.gui import GUI
-from config.settings import DEFAULT_KEYS
+import argparse
+import os
+
+from config.settings import (DEFAULT_KEYS, SOAK_SAMPLE_INTERVAL, WATCHDOG_THRESHOLD_MS, LEADERBOARD_SUMMARY_PATH,
+                             METRICS_DUMP_INTERVAL)
+
+def seed_value(text):
+    seed = int(text)
+    if not 0 <= seed < 2 ** 32:
+        # Seeds are stored as 32-bit values in results, ghosts and recordings
+        raise argparse.ArgumentTypeError("seed must be between 0 and 4294967295")
+    return seed
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Typing Trainer")
+    parser.add_argument('--soak', type=float, metavar='SECONDS',
+                        help="run in soak mode for the given duration and report resource growth")
+    parser.add_argument('--soak-interval', type=float, default=SOAK_SAMPLE_INTERVAL, metavar='SECONDS',
+                        help="seconds between soak samples")
+    parser.add_argument('--soak-idle', action='store_true',
+                        help="leave the app idle instead of typing synthetic keystrokes")
+    parser.add_argument('--soak-report', metavar='PATH',
+                        help="also write the soak report to this file")
+    parser.add_argument('--watchdog', type=float, nargs='?', const=WATCHDOG_THRESHOLD_MS, metavar='MS',
+                        help="report main loop stalls longer than MS milliseconds "
+                             f"(default {WATCHDOG_THRESHOLD_MS})")
+    parser.add_argument('--watchdog-report', metavar='PATH',
+                        help="also write the stall summary to this file")
+    parser.add_argument('--exam-seed', type=seed_value, metavar='SEED',
+                        help="give every session exactly the same text, e.g. for certification tests")
+    parser.add_argument('--terminal', action='store_true',
+                        help="run the curses front end in the terminal instead of opening a window")
+    parser.add_argument('--leaderboard', metavar='DIR',
+                        help="aggregate the results logs (*.jsonl) below DIR into a leaderboard summary and exit")
+    parser.add_argument('--leaderboard-output', default=LEADERBOARD_SUMMARY_PATH, metavar='PATH',
+                        help="where to write the leaderboard summary")
+    parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                        help="serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    parser.add_argument('--metrics-file', metavar='PATH',
+                        help="periodically write Prometheus metrics to this file")
+    parser.add_argument('--metrics-interval', type=float, default=METRICS_DUMP_INTERVAL, metavar='SECONDS',
+                        help="seconds between metrics file writes")
+    parser.add_argument('--build-curriculum', action='store_true',
+                        help="rebuild the lesson artifacts for every language and exit")
+    return parser.parse_args()
+
+def build_curricula():
+    from core.curriculum import artifact_path, load_curriculum
+    from core.dictionary_registry import DictionaryRegistry
+    registry = DictionaryRegistry()
+    for language in registry.languages():
+        # Remove the old artifact so load_curriculum rebuilds it
+        try:
+            os.remove(artifact_path(language))
+        except OSError:
+            pass
+        curriculum = load_curriculum(registry.get(language))
+        for lesson in curriculum.lessons:
+            print(f"{language:<10} {lesson.name:<12} {lesson.stats['word_count']:>5} words, "
+                  f"coverage {lesson.stats['letter_coverage']:.0%}")
+
+def build_leaderboard(directory, output):
+    from core.leaderboard import ALL_KEYS, aggregate_directory
+    summary, changed, total = aggregate_directory(directory, output)
+    print(f"Processed {changed} of {total} files, summary written to {output}")
+    overall = summary['key_sets'].get(ALL_KEYS)
+    if not overall:
+        return
+    bands = ", ".join(f"p{point}: {wpm}" for point, wpm in overall['percentiles'].items())
+    print(f"{overall['sessions']} sessions, WPM {bands}")
+    for position, entry in enumerate(overall['leaderboard'][:10], 1):
+        slope = summary['users'][entry['user']][ALL_KEYS]['slope']
+        print(f"{position:>3}. {entry['user']:<16} best {entry['best_wpm']:>4} WPM, "
+              f"average {entry['average_wpm']:>5}, {entry['sessions']:>4} sessions, {slope:+.1f} WPM/week")
+
+def start_metrics(args, writer):
+    """Start the requested metrics exporters and return them."""
+    if not args.metrics_port and not args.metrics_file:
+        return []
+    from core import metrics
+    metrics.add_collector(metrics.writer_collector(writer))
+    exporters = []
+    if args.metrics_port:
+        exporters.append(metrics.MetricsServer(args.metrics_port))
+    if args.metrics_file:
+        exporters.append(metrics.MetricsFileDumper(args.metrics_file, args.metrics_interval))
+    for exporter in exporters:
+        exporter.start()
+    return exporters
 
 def main():
+    args = parse_args()
+    if args.build_curriculum:
+        build_curricula()
+        return
+    if args.leaderboard:
+        build_leaderboard(args.leaderboard, args.leaderboard_output)
+        return
+    if args.terminal:
+        # Tk is never imported, so this works over SSH without a display
+        from ui.terminal_app import TerminalApp
+        app = TerminalApp(DEFAULT_KEYS)
+        exporters = start_metrics(args, app.writer)
+        app.run()
+        for exporter in exporters:
+            exporter.stop()
+        return
+
     # Initialize the GUI with the default keys from settings
-    app = GUI(DEFAULT_KEYS)
+    from ui.gui import GUI
+    app = GUI(DEFAULT_KEYS, exam_seed=args.exam_seed)
+
+    monitor = None
+    if args.soak:
+        from core.soak_monitor import SoakDriver, SoakMonitor
+        driver = None if args.soak_idle else SoakDriver(app)
+        monitor = SoakMonitor(app, args.soak, interval=args.soak_interval, driver=driver)
+        monitor.start()
+
+    exporters = start_metrics(args, app.writer)
+    
+    watchdog = None
+    if args.watchdog:
+        from core.watchdog import MainloopWatchdog
+        watchdog = MainloopWatchdog(app, threshold_ms=args.watchdog)
+        watchdog.start()
+
     app.run()
 
+    if monitor:
+        monitor.write_report(args.soak_report)
+    if watchdog:
+        watchdog.stop()
+        watchdog.write_report(args.watchdog_report)
+    for exporter in exporters:
+        exporter.stop()
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,105 @@
+"""
+Tests for the spaced-repetition scheduler's heap of due words.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from core.drill_scheduler import DrillScheduler, MAX_VIEWS, QUALITY_MISSED, QUALITY_SLOW, QUALITY_GOOD
+from core.dictionary_registry import can_form
+from config.settings import DRILL_FIRST_INTERVAL
+
+NOW = 1700000000.0
+
+
+def typable(keys):
+    return lambda word: can_form(word, keys)
+
+
+class DrillSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.scheduler = DrillScheduler(os.path.join(self.directory, 'drill_state.bin'))
+
+    def miss(self, word, due):
+        """Record a missed word so that it becomes due at the given time."""
+        self.scheduler.record(word, QUALITY_MISSED, now=due - DRILL_FIRST_INTERVAL)
+
+    def test_good_words_are_not_tracked(self):
+        self.scheduler.record("fine", QUALITY_GOOD, now=NOW)
+        self.assertEqual(len(self.scheduler), 0)
+
+    def test_due_order(self):
+        for offset, word in ((10, "third"), (30, "first"), (20, "second"), (-60, "later")):
+            self.miss(word, NOW - offset)
+        self.assertEqual(self.scheduler.due_words(10, now=NOW), ["first", "second", "third"])
+        self.assertEqual(self.scheduler.due_words(2, now=NOW), ["first", "second"])
+
+    def test_served_words_stay_due(self):
+        self.miss("word", NOW - 1)
+        self.assertEqual(self.scheduler.due_words(5, now=NOW), ["word"])
+        self.assertEqual(self.scheduler.due_words(5, now=NOW), ["word"])
+
+    def test_stale_entries_are_skipped(self):
+        self.miss("alpha", NOW - 10)
+        self.miss("beta", NOW - 5)
+        # A good review moves alpha into the future; its old heap entry becomes stale
+        self.scheduler.record("alpha", QUALITY_SLOW, now=NOW)
+        self.assertEqual(len(self.scheduler.heap), 3)
+        self.assertEqual(self.scheduler.due_words(5, now=NOW), ["beta"])
+        # Stale entries are popped, not pushed back
+        self.assertEqual(len(self.scheduler.heap), 2)
+
+    def test_rejected_words_do_not_hide_accepted_ones(self):
+        # Many untypable words are more overdue than the one typable word
+        for i in range(200):
+            self.miss("qwerty" + chr(ord('a') + i % 26) * (i // 26 + 1), NOW - 1000 - i)
+        self.miss("salad", NOW - 1)
+        accept = typable("asdfjkl;asdfjkl;")
+        # Without a key, the bounded scan only sees untypable words
+        self.assertEqual(self.scheduler.due_words(4, accept=accept, now=NOW), [])
+        self.assertEqual(self.scheduler.due_words(4, accept=accept, now=NOW, key="home"), ["salad"])
+
+    def test_views_follow_new_records(self):
+        accept = typable("asdfjkl")
+        self.assertEqual(self.scheduler.due_words(4, accept=accept, now=NOW, key="home"), [])
+        self.miss("flask", NOW - 1)
+        self.miss("quiz", NOW - 2)
+        self.assertEqual(self.scheduler.due_words(4, accept=accept, now=NOW, key="home"), ["flask"])
+        # Rescheduling leaves a stale entry in the view, which is skipped
+        self.scheduler.record("flask", QUALITY_GOOD, now=NOW)
+        self.assertEqual(self.scheduler.due_words(4, accept=accept, now=NOW, key="home"), [])
+
+    def test_view_limit(self):
+        for i in range(MAX_VIEWS + 2):
+            self.scheduler.due_words(1, accept=lambda word: True, now=NOW, key=str(i))
+        self.assertEqual(len(self.scheduler.views), MAX_VIEWS)
+        self.assertEqual(list(self.scheduler.views), [str(i) for i in range(2, MAX_VIEWS + 2)])
+
+    def test_compaction(self):
+        self.miss("word", NOW - 1)
+        self.scheduler.due_words(1, accept=lambda word: True, now=NOW, key="all")
+        # Each review leaves one stale entry; the heap is rebuilt once they pile up
+        for i in range(200):
+            self.scheduler.record("word", QUALITY_MISSED, now=NOW + i)
+        self.assertLessEqual(len(self.scheduler.heap), 2 * len(self.scheduler) + 64)
+        self.scheduler.compact()
+        self.assertEqual(self.scheduler.heap, [(self.scheduler.words["word"][0], "word")])
+        self.assertEqual(len(self.scheduler.views), 0)
+        due = self.scheduler.words["word"][0]
+        self.assertEqual(self.scheduler.due_words(1, accept=lambda word: True, now=due, key="all"), ["word"])
+
+    def test_save_and_load(self):
+        self.miss("alpha", NOW - 10)
+        self.miss("beta", NOW + 10)
+        self.scheduler.save()
+        loaded = DrillScheduler(self.scheduler.path)
+        self.assertEqual(loaded.words["alpha"][0], self.scheduler.words["alpha"][0])
+        self.assertEqual(loaded.due_words(5, now=NOW), ["alpha"])
+
+
+if __name__ == '__main__':
+    unittest.main()
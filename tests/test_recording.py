@@ -0,0 +1,105 @@
+"""
+Round-trip and truncation tests for the binary keystroke recordings.
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from core.persistence import BackgroundWriter
+from core.recording import SessionRecorder, RecordingReader
+
+
+class RecordingTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def record(self, keystrokes, start_time=1700000000.0, seed=0xDEADBEEF):
+        """Record (timestamp, typed or None, is_correct) keystrokes and return the recording's path."""
+        writer = BackgroundWriter()
+        writer.start()
+        recorder = SessionRecorder(writer, directory=self.directory, chunk_size=64)
+        recorder.start(start_time, seed, 60, "1min", "asdfjkl;", "English", "Home Row")
+        path = recorder.path
+        for timestamp, typed, is_correct in keystrokes:
+            recorder.on_keystroke("", 0, typed, is_correct, timestamp)
+        recorder.finish()
+        writer.close()
+        return path
+
+    def random_keystrokes(self, count, start_time=1700000000.0):
+        rng = random.Random(42)
+        alphabet = "asdf jkl;ÄéΩ\n" + chr(0x1F600)  # Includes multi-byte and non-BMP characters
+        keystrokes = []
+        ms = 0
+        for _ in range(count):
+            ms += rng.choice([0, 1, 90, 150, 400, 20000])  # Equal times and long pauses too
+            typed = None if rng.random() < 0.05 else rng.choice(alphabet)
+            is_correct = None if typed is None else rng.random() < 0.9
+            keystrokes.append((start_time + ms / 1000, typed, is_correct))
+        return keystrokes
+
+    def test_round_trip(self):
+        keystrokes = self.random_keystrokes(1000)
+        path = self.record(keystrokes)
+
+        with RecordingReader(path) as reader:
+            self.assertEqual((reader.start_time, reader.seed, reader.time_limit), (1700000000.0, 0xDEADBEEF, 60))
+            self.assertEqual((reader.mode, reader.keys, reader.language, reader.lesson),
+                             ("1min", "asdfjkl;", "English", "Home Row"))
+            self.assertEqual(len(reader), 1000)
+            decoded = list(reader.keystrokes())
+
+        for (timestamp, typed, is_correct), (seconds, read_typed, read_correct) in zip(keystrokes, decoded):
+            self.assertAlmostEqual(seconds, timestamp - 1700000000.0, places=3)
+            self.assertEqual(read_typed, typed)
+            self.assertEqual(read_correct, bool(is_correct))
+        # About three bytes per keystroke on this mix
+        self.assertLess(os.path.getsize(path), 4 * len(keystrokes))
+
+    def test_empty_session(self):
+        path = self.record([])
+        with RecordingReader(path) as reader:
+            self.assertEqual(len(reader), 0)
+            self.assertEqual(list(reader.keystrokes()), [])
+            self.assertEqual(reader.lesson, "Home Row")
+
+    def test_truncated_chunk_is_dropped(self):
+        keystrokes = self.random_keystrokes(200)
+        path = self.record(keystrokes)
+        with RecordingReader(path) as reader:
+            chunk_sizes = [count for count, _ in reader.chunks()]
+        self.assertEqual(chunk_sizes, [64, 64, 64, 8])
+
+        # Every cut inside the last chunk keeps exactly the complete chunks before it
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        for cut in range(1, 12):
+            with open(path, 'wb') as f:
+                f.write(data[:size - cut])
+            with RecordingReader(path) as reader:
+                self.assertEqual(len(reader), 192)
+                self.assertEqual([typed for _, typed, _ in reader.keystrokes()],
+                                 [typed for _, typed, _ in keystrokes[:192]])
+
+    def test_runs_in_the_same_second_are_kept_apart(self):
+        first = self.record(self.random_keystrokes(10))
+        second = self.record(self.random_keystrokes(20))
+        self.assertNotEqual(first, second)
+        with RecordingReader(first) as reader:
+            self.assertEqual(len(reader), 10)
+
+    def test_invalid_file(self):
+        path = os.path.join(self.directory, "junk.ttr")
+        with open(path, 'wb') as f:
+            f.write(b"not a recording at all")
+        with self.assertRaises(ValueError):
+            RecordingReader(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
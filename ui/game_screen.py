@@ -3,7 +3,12 @@ Game screen component for the typing trainer application.
 """
 
 import tkinter as tk
-from config.settings import FONT, STATS_FONT_SIZE, TIME_FONT_SIZE, TEXT_FONT_SIZE, TOP_PADDING, LINE_SIZE
+import tkinter.font as tkfont
+from config.settings import (FONT, STATS_FONT_SIZE, TIME_FONT_SIZE, TEXT_FONT, TEXT_FONT_SIZE, TOP_PADDING,
+                             LINE_SIZE, CHAR_SPACING, LAYOUT_DEBOUNCE_MS, TEXT_SIDE_PADDING, NEWLINE_GLYPH,
+                             CODE_LINE_SIZE)
+from ui.text_layout import GlyphMetrics, TextLayout
+from ui.keyboard_heatmap import KeyboardHeatmap
 
 class GameScreen:
     def __init__(self, root, callbacks, theme_manager=None):
@@ -17,6 +22,20 @@ class GameScreen:
         self.time_font_size = TIME_FONT_SIZE
         self.text_font_size = TEXT_FONT_SIZE
         self.top_padding = TOP_PADDING
+        self.text_font = tkfont.Font(root=root, family=TEXT_FONT, size=self.text_font_size)
+        self.layout = TextLayout(GlyphMetrics(self.text_font), char_spacing=CHAR_SPACING)
+        
+        # Letter labels are pooled and only repositioned, never rebuilt per line
+        self.text = ""
+        self.letter_labels = []  # Labels showing the current text, one per character
+        self.spare_labels = []  # Hidden labels kept for reuse
+        self.line_starts = []
+        self.placed = []  # (x, y) of each active label
+        self.layout_offset = 0
+        self.layout_width = 0
+        self.layout_job = None
+        self.ghost_index = None  # Letter currently highlighted by the ghost cursor
+        self.ghost_lead = None
         
         # Initialize frame
         self.game_frame = tk.Frame(root)
@@ -57,17 +76,29 @@ class GameScreen:
         self.accuracy_label = tk.Label(self.stats_frame, text="Accuracy: 100%", font=(self.font, self.stats_font_size))
         self.accuracy_label.grid(row=0, column=2, padx=10)
         
+        # Lead over the ghost run; only shown while racing
+        self.ghost_label = tk.Label(self.stats_frame, text="", font=(self.font, self.stats_font_size))
+        self.ghost_label.grid(row=0, column=5, padx=10)
+        self.ghost_label.grid_remove()
+        
+        # Position in an open text file; only shown while practising on one
+        self.source_label = tk.Label(self.stats_frame, text="", font=(self.font, int(self.stats_font_size*0.75)))
+        self.source_label.grid(row=1, column=0, columnspan=6)
+        self.source_label.grid_remove()
+        self.source_text = None
+        
         self.letter_frames = tk.Frame(self.game_frame)
-        self.letter_frames.pack(pady=20)
+        self.letter_frames.pack(pady=20, padx=TEXT_SIDE_PADDING, fill=tk.X)
+        self.letter_frames.bind("<Configure>", self.on_configure)
+        
+        # Error rate and latency per key, updated as the session is typed
+        self.heatmap = KeyboardHeatmap(self.game_frame, self.theme_manager)
+        self.heatmap.pack(pady=10)
     
     def display_text(self, text):
         """Display the text for typing exercise."""
-        for widget in self.letter_frames.winfo_children():
-            widget.destroy()
-        
-        column = 0
-        row = 0
-        displayed_indices = []
+        self.text = text
+        self.ghost_index = None  # Every label gets its background reset below
         
         # Get the current theme colors
         fg_color = "#000000"  # Default foreground color
@@ -78,28 +109,134 @@ class GameScreen:
             fg_color = current_theme["fg"]
             bg_color = current_theme["bg"]
         
-        for i, char in enumerate(text):
-            display_char = char
-
-            if column > LINE_SIZE and display_char == ' ':
-                column = 0
-                row += 1
-                continue
-                
-            # Apply theme colors to the letter labels
-            letter_label = tk.Label(self.letter_frames, text=display_char, font=("Courier", self.text_font_size), 
-                                width=1, borderwidth=0, relief="flat", fg=fg_color, bg=bg_color)
-            letter_label.grid(row=row, column=column, padx=1)
-            
-            displayed_indices.append(i)
-            column += 1
-        
-        return displayed_indices
+        # Grow or shrink the set of active labels using the spare pool
+        while len(self.letter_labels) < len(text):
+            if self.spare_labels:
+                label = self.spare_labels.pop()
+            else:
+                label = tk.Label(self.letter_frames, font=self.text_font, borderwidth=0,
+                                 padx=0, pady=0, highlightthickness=0, relief="flat")
+            self.letter_labels.append(label)
+        while len(self.letter_labels) > len(text):
+            label = self.letter_labels.pop()
+            label.place_forget()
+            self.spare_labels.append(label)
+        
+        for label, char in zip(self.letter_labels, text):
+            # Newlines are typed too, so they get a visible glyph at the end of their line
+            label.config(text=NEWLINE_GLYPH if char == "\n" else char, fg=fg_color, bg=bg_color)
+        
+        self.line_starts = []
+        self.relayout(force=True)
+    
+    def available_width(self):
+        """Width the text may use: the frame width capped at LINE_SIZE characters.
+        
+        Source code (any text with newlines) gets CODE_LINE_SIZE so its lines
+        rarely have to wrap.
+        """
+        width = self.letter_frames.winfo_width()
+        if width <= 1:
+            # Not mapped yet; the <Configure> event will correct this
+            width = self.root.winfo_width() - 2 * TEXT_SIDE_PADDING
+        line_size = CODE_LINE_SIZE if "\n" in self.text else LINE_SIZE
+        return max(1, min(width, line_size * self.layout.advance("m")))
+    
+    def on_configure(self, event):
+        """Debounce resize events so the layout is recomputed once per burst."""
+        if event.width == self.layout_width:
+            return
+        if self.layout_job is not None:
+            self.root.after_cancel(self.layout_job)
+        self.layout_job = self.root.after(LAYOUT_DEBOUNCE_MS, self.relayout)
+    
+    def relayout(self, force=False):
+        """Reposition the letter labels for the current width.
+        
+        Only labels whose position actually changed are moved; nothing is
+        rebuilt, and if the line breaks are unchanged only the horizontal
+        centring offset is touched.
+        """
+        self.layout_job = None
+        frame_width = self.letter_frames.winfo_width()
+        max_width = self.available_width()
+        self.layout_width = frame_width
+        
+        line_starts = self.layout.break_lines(self.text, max_width)
+        positions, (block_width, block_height) = self.layout.place(self.text, line_starts)
+        offset = max(0, (max(frame_width, block_width) - block_width) // 2)
+        
+        if not force and line_starts == self.line_starts and offset == self.layout_offset:
+            return
+        self.line_starts = line_starts
+        self.layout_offset = offset
+        
+        placed = [(x + offset, y) for x, y in positions]
+        for i, (label, position) in enumerate(zip(self.letter_labels, placed)):
+            if force or position != self.placed[i]:
+                label.place(x=position[0], y=position[1])
+        self.placed = placed
+        
+        # place() does not propagate size, so give the frame the block height
+        self.letter_frames.config(height=block_height)
+    
+    def get_letter_label(self, index):
+        """Return the label showing the character at index, if any."""
+        if 0 <= index < len(self.letter_labels):
+            return self.letter_labels[index]
+        return None
     
     def update_letter_color(self, index, color):
         """Update the color of a letter at the given index."""
-        if index < len(self.letter_frames.winfo_children()):
-            self.letter_frames.winfo_children()[index].config(foreground=color)
+        label = self.get_letter_label(index)
+        if label is not None:
+            label.config(foreground=color)
+    
+    def set_ghost_index(self, index):
+        """Move the ghost highlight, touching only the old and new letter."""
+        if index == self.ghost_index:
+            return
+        theme = self.theme_manager.get_current_theme()
+        old_label = self.get_letter_label(self.ghost_index) if self.ghost_index is not None else None
+        if old_label is not None:
+            old_label.config(bg=theme["bg"])
+        new_label = self.get_letter_label(index) if index is not None else None
+        if new_label is not None:
+            new_label.config(bg=theme["ghost"])
+        self.ghost_index = index
+    
+    def set_ghost_lead(self, lead):
+        """Show how many characters the player is ahead of the ghost."""
+        if lead == self.ghost_lead:
+            return
+        if self.ghost_lead is None:
+            self.ghost_label.grid()
+        self.ghost_lead = lead
+        self.ghost_label.config(text=f"Ghost: {lead:+d}")
+    
+    def clear_ghost(self):
+        self.set_ghost_index(None)
+        self.ghost_lead = None
+        self.ghost_label.grid_remove()
+    
+    def set_source_progress(self, text):
+        """Show where the current text is in its file, or hide the line with None."""
+        if text == self.source_text:
+            return
+        if text is None:
+            self.source_label.grid_remove()
+        else:
+            self.source_label.config(text=text)
+            if self.source_text is None:
+                self.source_label.grid()
+        self.source_text = text
+    
+    def refresh_ghost(self):
+        """Re-apply the ghost highlight after a theme change."""
+        index = self.ghost_index
+        self.ghost_index = None
+        if index is not None:
+            self.set_ghost_index(index)
     
     def show(self):
         self.game_frame.pack(expand=True, fill="both")
@@ -116,5 +253,6 @@ class GameScreen:
             'time_label': self.time_label,
             'wpm_label': self.wpm_label,
             'accuracy_label': self.accuracy_label,
-            'theme_game_button': self.theme_game_button
+            'theme_game_button': self.theme_game_button,
+            'game_heatmap': self.heatmap
         }
\ No newline at end of file
@@ -2,38 +2,104 @@
 Main GUI class for the Typing Trainer application.
 """
 
+import json
+import random
+import time
 import tkinter as tk
 from tkinter import messagebox
 
-from config.settings import DEFAULT_KEYS, DEFAULT_WINDOW_SIZE
+from config.settings import (DEFAULT_KEYS, DEFAULT_WINDOW_SIZE, WINDOW_SCREEN_FRACTION, RESULTS_PATH, USER_NAME,
+                             WRITER_EXIT_TIMEOUT)
 from core.text_generator import TextGenerator
+from core.code_index import CodeIndexLoader
+from core.background import BackgroundTask
+from core.curriculum import load_curriculum
 from core.theme_manager import ThemeManager
-from core.stats_manager import StatsManager
+from core.stats_manager import StatsManager, time_limit_for
+from core.drill_scheduler import DrillScheduler, WordTracker
+from core.frame_scheduler import FrameScheduler
+from core.ghost import GhostPlayer, GhostRecorder, GhostStore, ghost_key
+from core.persistence import BackgroundWriter
+from core.recording import SessionRecorder
+from core.leaderboard import LeaderboardSummary
+from core import metrics
 from ui.menu_screen import MenuScreen
 from ui.game_screen import GameScreen
 from ui.results_screen import ResultsScreen
 
 class GUI:
-    def __init__(self, keys_to_use):
+    def __init__(self, keys_to_use, exam_seed=None):
         self.keys_to_use = keys_to_use
         self.default_keys = keys_to_use  # Store the default keys
         
         # Initialize window
         self.root = tk.Tk()
         self.root.title("Typing Trainer")
-        self.root.geometry(DEFAULT_WINDOW_SIZE)
+        self.root.geometry(self.initial_geometry())
+        min_width, min_height = (int(v) for v in DEFAULT_WINDOW_SIZE.split("x"))
+        self.root.minsize(min_width, min_height)
+        self.root.bind("<F11>", self.toggle_fullscreen)
+        # Closing the window goes through the same path as the Exit button so pending saves finish
+        self.root.protocol("WM_DELETE_WINDOW", self.exit_application)
+        
+        # All saving goes through a background thread, never the Tk main loop
+        self.writer = BackgroundWriter()
         
         # Initialize modules
         self.theme_manager = ThemeManager(self.root)
-        self.text_generator = TextGenerator()
+        self.text_generator = TextGenerator(writer=self.writer)
         
         # Game state variables
         self.current_text = [""]
         self.current_index = [0]
-        self.displayed_indices = []
         self.time_mode = "freeplay"  # Default mode
         self.custom_time = 0
         
+        # Long-running helpers (soak driver, monitors, ...) whose after() jobs
+        # must survive screen switches. Each one exposes get_timer_ids().
+        self.services = []
+        
+        # Called as listener(text, index, typed, is_correct, timestamp) for every
+        # keystroke; typed and is_correct are None for backspace
+        self.keystroke_listeners = []
+        
+        # Weak words are always tracked; drill mode mixes them into sentences
+        self.drill_scheduler = DrillScheduler()
+        self.keystroke_listeners.append(WordTracker(self.drill_scheduler).on_keystroke)
+        
+        # Every session draws its text from its own seeded generator so a later
+        # race against it can reproduce exactly the same text
+        self.session_seed = None
+        self.session_rng = random.Random()
+        self.sentence_offset = 0  # Characters in the finished sentences of this session
+        
+        # With an exam seed every session (on any machine) gets the same sentences,
+        # each one derived from the seed and its number and served from the exercise cache
+        self.exam_seed = exam_seed
+        self.sentence_number = 0
+        
+        # Ghost race state
+        self.ghost_enabled = False
+        self.ghost_key = None
+        self.ghost_player = None
+        self.ghost_store = GhostStore(writer=self.writer)
+        self.ghost_recorder = GhostRecorder()
+        self.keystroke_listeners.append(self.ghost_recorder.on_keystroke)
+        
+        # Written by the leaderboard aggregator; read for "your rank" on the results screen
+        self.leaderboard = LeaderboardSummary()
+        
+        # Every keystroke of a session is kept in a compact binary recording
+        self.session_recorder = SessionRecorder(self.writer)
+        self.keystroke_listeners.append(self.session_recorder.on_keystroke)
+        
+        # Source code directories are indexed in the background; an index that
+        # finishes during a session is only used from the next visit to the menu
+        self.code_index_loader = None
+        self.pending_text_source = None
+        self.curriculum_loader = None
+        self.pending_lesson = None
+        
         # Create callbacks for UI components
         self.callbacks = self.create_callbacks()
         
@@ -41,6 +107,7 @@ class GUI:
         self.menu_screen = MenuScreen(self.root, self.callbacks, self.theme_manager)
         self.game_screen = GameScreen(self.root, self.callbacks, self.theme_manager)
         self.results_screen = ResultsScreen(self.root, self.callbacks, self.theme_manager)
+        self.keystroke_listeners.append(self.game_screen.heatmap.on_keystroke)
         
         # Create GUI elements dictionary for theme manager
         self.gui_elements = {
@@ -69,10 +136,25 @@ class GUI:
             'gui': self  # Pass self reference to allow callbacks
         })
         
+        # One shared tick for animations such as the ghost cursor
+        self.frame_scheduler = FrameScheduler(self.root)
+        self.register_service(self.frame_scheduler)
+        
         # Apply theme and show menu screen
         self.theme_manager.apply_theme(self.gui_elements)
         self.show_menu()
     
+    def initial_geometry(self):
+        """Size the window relative to the screen, never below the default size."""
+        min_width, min_height = (int(v) for v in DEFAULT_WINDOW_SIZE.split("x"))
+        width = max(min_width, int(self.root.winfo_screenwidth() * WINDOW_SCREEN_FRACTION))
+        height = max(min_height, int(self.root.winfo_screenheight() * WINDOW_SCREEN_FRACTION))
+        return f"{width}x{height}"
+    
+    def toggle_fullscreen(self, event=None):
+        """Switch fullscreen on or off; the text re-lays out on resize."""
+        self.root.attributes("-fullscreen", not int(self.root.attributes("-fullscreen")))
+    
     def create_callbacks(self):
         """Create a dictionary of callback functions for UI components."""
         return {
@@ -83,13 +165,27 @@ class GUI:
             'set_custom_keys': self.set_custom_keys,
             'reset_to_default_keys': self.reset_to_default_keys,
             'exit_application': self.exit_application,
-            'get_keys_to_use': lambda: self.keys_to_use  # Function to return current keys
+            'open_text_file': self.open_text_file,
+            'close_text_file': self.close_text_file,
+            'open_code_directory': self.open_code_directory,
+            'cancel_code_index': self.cancel_code_index,
+            'is_indexing_code': lambda: self.code_index_loader is not None,
+            'get_text_source_kind': lambda: self.text_generator.text_source.kind if self.text_generator.text_source else None,
+            'toggle_drill_mode': self.toggle_drill_mode,
+            'toggle_ghost_mode': self.toggle_ghost_mode,
+            'set_lesson': self.set_lesson,
+            'set_language': self.set_language,
+            'get_language': lambda: self.text_generator.language,
+            'get_languages': self.text_generator.get_languages,
+            'get_keys_to_use': lambda: self.keys_to_use,  # Function to return current keys
+            'is_exam': lambda: self.exam_seed is not None
         }
     
     def toggle_theme(self):
         """Toggle between light and dark themes."""
         self.theme_manager.toggle_theme()
         self.theme_manager.apply_theme(self.gui_elements)
+        self.game_screen.refresh_ghost()
     
     def show_menu(self):
         """Show the menu screen."""
@@ -98,6 +194,14 @@ class GUI:
         
         # Unbind key events
         self.root.unbind("<KeyPress>")
+        self.stop_ghost_race()
+        self.session_recorder.finish()
+        if self.pending_text_source:
+            self.text_generator.set_text_source(self.pending_text_source)
+            self.pending_text_source = None
+            self.menu_screen.update_source_buttons()
+        if self.pending_lesson:
+            self.set_lesson(self.pending_lesson)
         
         # Hide other screens and show menu
         self.game_screen.hide()
@@ -116,9 +220,21 @@ class GUI:
         wpm = self.stats_manager.calculate_wpm()
         accuracy = self.stats_manager.calculate_accuracy()
         elapsed_time = self.stats_manager.get_elapsed_time()
+        self.stats_manager.record_sample(elapsed_time)
+        
+        metrics.SESSIONS_COMPLETED.inc()
+        
+        # Queue the results and review schedule; the writer thread saves them
+        self.save_results(wpm, accuracy, elapsed_time)
+        self.drill_scheduler.save(self.writer)
+        self.stop_ghost_race()
+        self.save_ghost_run(wpm)
+        self.session_recorder.finish()
         
         # Update results screen with stats
-        self.results_screen.update_results(wpm, accuracy, elapsed_time)
+        rank = self.leaderboard.rank_text(USER_NAME, self.keys_to_use, wpm)
+        self.results_screen.update_results(wpm, accuracy, elapsed_time, self.stats_manager.get_samples(), rank,
+                                           self.game_screen.heatmap.stats)
         
         # Hide other screens and show results
         self.game_screen.hide()
@@ -128,6 +244,18 @@ class GUI:
         # Apply theme
         self.theme_manager.apply_theme(self.gui_elements)
     
+    def save_results(self, wpm, accuracy, elapsed_time):
+        """Append the finished session to the results log."""
+        lesson = self.text_generator.lesson
+        record = self.stats_manager.build_record(wpm, accuracy, elapsed_time, {
+            'mode': self.time_mode,
+            'keys': self.keys_to_use,
+            'language': self.text_generator.language,
+            'lesson': lesson.name if lesson else None,
+            'seed': self.session_seed,
+        })
+        self.writer.append(RESULTS_PATH, json.dumps(record) + "\n")
+    
     def set_time_mode(self, mode):
         """Set the time mode and start the game."""
         self.time_mode = mode
@@ -140,10 +268,191 @@ class GUI:
     def set_custom_keys(self, keys):
         """Set custom keys to use for typing practice."""
         self.keys_to_use = keys
+        self.cancel_curriculum_build()
+        self.text_generator.set_lesson(None)
     
     def reset_to_default_keys(self):
         """Reset keys to default."""
         self.keys_to_use = self.default_keys
+        self.cancel_curriculum_build()
+        self.text_generator.set_lesson(None)
+    
+    def set_lesson(self, name):
+        """Practise a curriculum lesson; its keys replace the custom keys.
+        
+        A curriculum that is not loaded yet is built off the main loop, and the
+        lesson is applied once it is ready.
+        """
+        self.cancel_curriculum_build()
+        if self.text_generator.has_curriculum():
+            self.text_generator.set_lesson(name)
+            self.keys_to_use = self.text_generator.lesson.keys
+            return
+        language = self.text_generator.language
+        dictionary = self.text_generator.dictionary  # Loaded here, not on the worker thread
+        self.curriculum_loader = BackgroundTask(
+            self.root, lambda progress: load_curriculum(dictionary), None,
+            lambda curriculum, error: self.curriculum_done(language, name, curriculum, error), name="curriculum")
+        self.register_service(self.curriculum_loader)
+        self.curriculum_loader.start()
+        self.menu_screen.show_lessons_building(True)
+    
+    def curriculum_done(self, language, name, curriculum, error):
+        self.unregister_service(self.curriculum_loader)
+        self.curriculum_loader = None
+        self.menu_screen.show_lessons_building(False)
+        if error:
+            messagebox.showerror("Cannot Build Lessons", str(error))
+            return
+        self.text_generator.add_curriculum(language, curriculum)
+        if self.menu_screen.menu_frame.winfo_ismapped():
+            # The language may have changed meanwhile; then its curriculum is built next
+            self.set_lesson(name)
+        else:
+            # Like a code index, the lesson is not switched under a running session
+            self.pending_lesson = name
+    
+    def cancel_curriculum_build(self):
+        """Drop a lesson whose curriculum is still being built."""
+        self.pending_lesson = None
+        if self.curriculum_loader:
+            self.curriculum_loader.cancel()
+            self.unregister_service(self.curriculum_loader)
+            self.curriculum_loader = None
+            self.menu_screen.show_lessons_building(False)
+    
+    def toggle_drill_mode(self):
+        """Turn mixing of due review words into sentences on or off."""
+        if self.exam_seed is not None:
+            return False  # Exam text is the same for every candidate
+        if self.text_generator.drill_scheduler:
+            self.text_generator.drill_scheduler = None
+        else:
+            self.text_generator.drill_scheduler = self.drill_scheduler
+        return self.text_generator.drill_scheduler is not None
+    
+    def toggle_ghost_mode(self):
+        """Turn racing against the best earlier run on or off."""
+        self.ghost_enabled = not self.ghost_enabled
+        return self.ghost_enabled
+    
+    def current_ghost_key(self, time_limit):
+        """Return the key of comparable runs, or None if runs cannot be replayed."""
+        # Only timed dictionary sessions produce the same text from the same seed
+        if time_limit <= 0 or self.text_generator.text_source or self.text_generator.drill_scheduler:
+            return None
+        lesson = self.text_generator.lesson
+        return ghost_key(self.keys_to_use, self.text_generator.language, time_limit,
+                         self.text_generator.dictionary.content_hash, lesson.name if lesson else None,
+                         self.exam_seed)
+    
+    def start_ghost_race(self, time_limit):
+        """Seed the session and, if racing, load the ghost to replay."""
+        self.ghost_key = self.current_ghost_key(time_limit)
+        best_run = None
+        if self.ghost_enabled and self.ghost_key:
+            best_run = self.ghost_store.load_best(self.ghost_key)
+        
+        if self.exam_seed is not None:
+            # Exam runs are stored under their own key, so any best run typed this exam's text
+            self.session_seed = self.exam_seed
+        else:
+            # Reusing the best run's seed gives exactly the text the ghost typed
+            self.session_seed = best_run['seed'] if best_run else random.getrandbits(32)
+        self.session_rng = random.Random(self.session_seed)
+        self.ghost_recorder.start(self.stats_manager.start_time)
+        
+        self.ghost_player = GhostPlayer(best_run) if best_run else None
+        if self.ghost_player:
+            self.frame_scheduler.subscribe(self.update_ghost)
+    
+    def update_ghost(self, now):
+        """Frame tick: move the ghost cursor to where the best run was."""
+        position = self.ghost_player.position_at(now - self.stats_manager.start_time)
+        index = position - self.sentence_offset
+        self.game_screen.set_ghost_index(index if 0 <= index < len(self.current_text[0]) else None)
+        self.game_screen.set_ghost_lead(self.sentence_offset + self.current_index[0] - position)
+    
+    def stop_ghost_race(self):
+        if self.ghost_player:
+            self.frame_scheduler.unsubscribe(self.update_ghost)
+            self.ghost_player = None
+            self.game_screen.clear_ghost()
+    
+    def save_ghost_run(self, wpm):
+        """Keep the finished run if it is the best under the same conditions."""
+        if not self.ghost_key or not self.ghost_recorder.times:
+            return
+        self.ghost_store.save_if_best(self.ghost_key, {
+            'seed': self.session_seed,
+            'keys': self.keys_to_use,
+            'language': self.text_generator.language,
+            'time_limit': self.stats_manager.time_limit,
+            'wpm': wpm,
+            'times': self.ghost_recorder.times,
+            'positions': self.ghost_recorder.positions,
+        })
+    
+    def set_language(self, language):
+        """Set the dictionary language used for practice text."""
+        lesson = self.text_generator.lesson
+        if not lesson or self.text_generator.has_curriculum(language):
+            # A lesson still being built is built for the new language when its build finishes
+            self.text_generator.set_language(language)
+            return
+        # Keep the lesson, but build the new language's curriculum off the main loop
+        self.text_generator.set_lesson(None)
+        self.text_generator.set_language(language)
+        self.set_lesson(lesson.name)
+    
+    def open_text_file(self, path):
+        """Practise on a text file; returns False if it cannot be used."""
+        if self.exam_seed is not None:
+            messagebox.showerror("Cannot Open Text", "Exams are taken on generated text.")
+            return False
+        self.cancel_code_index()
+        try:
+            self.text_generator.open_text_file(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Cannot Open Text", str(e))
+            return False
+        return True
+    
+    def open_code_directory(self, path):
+        """Start indexing a directory of source code; its snippets are practised once it is done."""
+        if self.exam_seed is not None:
+            messagebox.showerror("Cannot Open Code", "Exams are taken on generated text.")
+            return
+        self.cancel_code_index()
+        self.code_index_loader = CodeIndexLoader(self.root, path, self.menu_screen.show_index_progress,
+                                                 self.code_index_done)
+        self.register_service(self.code_index_loader)
+        self.code_index_loader.start()
+    
+    def code_index_done(self, source, error):
+        self.unregister_service(self.code_index_loader)
+        self.code_index_loader = None
+        if error:
+            messagebox.showerror("Cannot Open Code", str(error))
+        elif self.menu_screen.menu_frame.winfo_ismapped():
+            self.text_generator.set_text_source(source)
+        else:
+            # Switching mid-session would change the text under a running ghost race and recording
+            self.pending_text_source = source
+        self.menu_screen.update_source_buttons()
+    
+    def cancel_code_index(self):
+        """Stop a directory that is still being indexed from being opened."""
+        if self.code_index_loader:
+            self.code_index_loader.cancel()
+            self.unregister_service(self.code_index_loader)
+            self.code_index_loader = None
+        self.pending_text_source = None
+    
+    def close_text_file(self):
+        """Return to dictionary-generated practice text."""
+        self.cancel_code_index()
+        self.text_generator.close_text_source()
     
     def start_game(self):
         """Start a new typing game."""
@@ -153,18 +462,21 @@ class GUI:
         self.game_screen.show()
         
         # Set the game time limit based on the selected mode
-        if self.time_mode == "1min":
-            time_limit = 60  # 1 minute in seconds
-        elif self.time_mode == "5min":
-            time_limit = 300  # 5 minutes in seconds
-        elif self.time_mode == "custom":
-            time_limit = self.custom_time
-        else:  # freeplay
-            time_limit = 0  # No time limit
+        time_limit = time_limit_for(self.time_mode, self.custom_time)
+        
+        metrics.SESSIONS_STARTED.inc()
         
         # Reset stats and start tracking
         self.stats_manager.reset_stats(time_limit)
         self.current_index[0] = 0
+        self.current_text[0] = ""
+        self.sentence_offset = 0
+        self.sentence_number = 0
+        self.start_ghost_race(time_limit)
+        self.game_screen.heatmap.reset()
+        lesson = self.text_generator.lesson
+        self.session_recorder.start(self.stats_manager.start_time, self.session_seed, time_limit, self.time_mode,
+                                    self.keys_to_use, self.text_generator.language, lesson.name if lesson else None)
         
         self.stats_manager.update_timer()
         self.stats_manager.update_stats()
@@ -178,14 +490,35 @@ class GUI:
     
     def create_new_sentence(self):
         """Create and display a new sentence for typing."""
-        new_text = self.text_generator.create_english_sentence(self.keys_to_use)
+        if self.exam_seed is not None:
+            self.sentence_number += 1
+            new_text = self.text_generator.create_english_sentence(
+                self.keys_to_use, seed=f"{self.exam_seed}:{self.sentence_number}")
+        else:
+            new_text = self.text_generator.create_english_sentence(self.keys_to_use, rng=self.session_rng)
+        self.sentence_offset += len(self.current_text[0])
         self.current_text[0] = new_text
-        self.displayed_indices = self.game_screen.display_text(new_text)
+        self.game_screen.display_text(new_text)
         self.current_index[0] = 0
+        
+        source = self.text_generator.text_source
+        if source and source.kind == 'text':
+            line, total_lines = source.progress()
+            self.game_screen.set_source_progress(f"{source.name}: line {line:,} of {total_lines:,}")
+        else:
+            self.game_screen.set_source_progress(None)
     
     def on_key_press(self, event):
-        """Handle key press events during the typing game."""
-        if len(self.game_screen.letter_frames.winfo_children()) == 0:
+        """Handle key press events during the typing game, timing each one."""
+        started = time.perf_counter()
+        try:
+            self.handle_key_press(event)
+        finally:
+            metrics.KEY_PRESS_SECONDS.observe(time.perf_counter() - started)
+    
+    def handle_key_press(self, event):
+        """Check one key against the current text and advance the cursor."""
+        if not self.game_screen.letter_labels:
             self.create_new_sentence()
             return
 
@@ -200,75 +533,135 @@ class GUI:
         elif event.keysym == "BackSpace":
             pressed_char = 'backspace'
             special = True
+        elif event.keysym in ("Return", "KP_Enter"):
+            pressed_char = '\n'
+        elif event.keysym in ("Tab", "ISO_Left_Tab"):
+            return  # Indentation is skipped automatically after each newline
         else:
             pressed_char = event.char
+            if not pressed_char:
+                return  # Modifier keys such as Shift produce no character
 
         # Get current theme colors
         current_theme = self.theme_manager.get_current_theme()
         
         # Handle backspace - delete the previous character
         if self.current_index[0] > 0 and pressed_char == "backspace":
-            displayed_idx = self.displayed_indices.index(self.current_index[0] - 1) if self.current_index[0] - 1 in self.displayed_indices else -1
-            letter_labels = self.game_screen.letter_frames.winfo_children()
+            # Step back over skipped indentation to the newline before it
+            self.current_index[0] = self.indentation_start(self.current_index[0])
+            
+            letter_label = self.game_screen.get_letter_label(self.current_index[0] - 1)
             
-            if displayed_idx >= 0:
-                deleted_letter_color = letter_labels[displayed_idx].cget("foreground")
-                letter_labels[displayed_idx].config(foreground=current_theme["fg"], font=("Courier", self.game_screen.text_font_size))
+            if letter_label is not None:
+                deleted_letter_color = letter_label.cget("foreground")
+                letter_label.config(foreground=current_theme["fg"])
                 self.stats_manager.update_stats_based_on_color(deleted_letter_color)
             
             self.current_index[0] -= 1
+            self.notify_keystroke(self.current_index[0], None, None)
             return
 
         # Handle regular key press
         if self.current_index[0] < len(self.current_text[0]) and pressed_char == self.current_text[0][self.current_index[0]] and not special:
-            displayed_idx = self.displayed_indices.index(self.current_index[0]) if self.current_index[0] in self.displayed_indices else -1
-            
-            letter_labels = self.game_screen.letter_frames.winfo_children()
-            if displayed_idx >= 0 and displayed_idx < len(letter_labels):
-                letter_labels[displayed_idx].config(foreground=current_theme["correct"], font=("Courier", self.game_screen.text_font_size))
+            self.game_screen.update_letter_color(self.current_index[0], current_theme["correct"])
             
             self.stats_manager.register_keystroke(True)
+            self.notify_keystroke(self.current_index[0], pressed_char, True)
             self.current_index[0] += 1
         elif not special:
-            displayed_idx = self.displayed_indices.index(self.current_index[0]) if self.current_index[0] in self.displayed_indices else -1
-            
-            letter_labels = self.game_screen.letter_frames.winfo_children()
-            if displayed_idx >= 0 and displayed_idx < len(letter_labels):
-                letter_labels[displayed_idx].config(foreground=current_theme["incorrect"], font=("Courier", self.game_screen.text_font_size))
+            self.game_screen.update_letter_color(self.current_index[0], current_theme["incorrect"])
             
             self.stats_manager.register_keystroke(False)
+            self.notify_keystroke(self.current_index[0], pressed_char, False)
             self.current_index[0] += 1
 
+        # After a newline the cursor jumps over the next line's indentation
+        if not special and self.current_text[0][self.current_index[0] - 1] == '\n':
+            self.current_index[0] = self.indentation_end(self.current_index[0])
+        
         # If we've reached the end of the text, generate a new sentence
         if self.current_index[0] == len(self.current_text[0]):
             self.create_new_sentence()
     
-    def cancel_all_timers(self):
+    def indentation_end(self, index):
+        """Return the index of the first character after the spaces starting at index."""
+        text = self.current_text[0]
+        while index < len(text) and text[index] == ' ':
+            index += 1
+        return index
+    
+    def indentation_start(self, index):
+        """Return the start of a line if index is at the end of its indentation, else index."""
+        text = self.current_text[0]
+        start = index
+        while start > 0 and text[start - 1] == ' ':
+            start -= 1
+        return start if start < index and start > 0 and text[start - 1] == '\n' else index
+    
+    def notify_keystroke(self, index, typed, is_correct):
+        """Pass the result of a keystroke to every keystroke listener."""
+        timestamp = time.time()
+        if typed is not None:
+            metrics.record_keystroke(is_correct)
+        for listener in self.keystroke_listeners:
+            listener(self.current_text[0], index, typed, is_correct, timestamp)
+    
+    def register_service(self, service):
+        """Register a helper whose timers are kept alive across screen changes."""
+        if service not in self.services:
+            self.services.append(service)
+    
+    def unregister_service(self, service):
+        """Stop protecting the timers of a previously registered helper."""
+        if service in self.services:
+            self.services.remove(service)
+    
+    def cancel_all_timers(self, include_services=False):
         """Cancel all active timers to prevent memory leaks."""
         # Cancel stats manager timers
         if hasattr(self, 'stats_manager'):
             self.stats_manager.cancel_timers()
+        
+        # Timers owned by registered services are left alone unless asked
+        protected_ids = set()
+        if not include_services:
+            for service in self.services:
+                protected_ids.update(service.get_timer_ids())
             
         # Cancel any other after callbacks
         try:
             for after_id in self.root.tk.call('after', 'info'):
-                self.root.after_cancel(after_id)
+                if str(after_id) not in protected_ids:
+                    self.root.after_cancel(after_id)
         except Exception:
             pass
     
     def exit_application(self):
         """Safely exit the application."""
         # First cancel all timers to prevent callbacks during destruction
-        self.cancel_all_timers()
+        self.cancel_all_timers(include_services=True)
         
         # Unbind key events
         self.root.unbind("<KeyPress>")
         
+        # Release the open text file and queue its bookmark and the review schedule
+        self.cancel_code_index()
+        self.cancel_curriculum_build()
+        self.text_generator.close_text_source()
+        self.drill_scheduler.save(self.writer)
+        self.session_recorder.finish()
+        
         try:
-            # Quit the mainloop first
+            # Quit the mainloop first, and hide the window while pending writes finish
             self.root.quit()
+            self.root.withdraw()
         except Exception:
             pass
+        
+        # Give pending writes a bounded time to finish
+        if not self.writer.close(timeout=WRITER_EXIT_TIMEOUT):
+            messagebox.showwarning("Exit", f"Pending saves did not finish within {WRITER_EXIT_TIMEOUT}s; "
+                                           "recent results may be lost.")
             
         try:
             # Then destroy the window
@@ -0,0 +1,141 @@
+"""
+On-screen keyboard colored by the error rate and latency of each key.
+"""
+
+import tkinter as tk
+from config.settings import (FONT, HEATMAP_KEY_SIZE, HEATMAP_FONT_SIZE, HEATMAP_LEVELS, HEATMAP_ERROR_RATE_MAX,
+                             HEATMAP_FAST_MS, HEATMAP_SLOW_MS, HEATMAP_MAX_LATENCY_MS)
+
+# Rows of (key, label, width in keys), each row starting at an offset in keys
+KEYBOARD_ROWS = [
+    (0, [(char, char, 1) for char in "`1234567890-="]),
+    (1.5, [(char, char, 1) for char in "qwertyuiop[]\\"]),
+    (1.75, [(char, char, 1) for char in "asdfghjkl;'"] + [("\n", "Enter", 2.25)]),
+    (2.25, [(char, char, 1) for char in "zxcvbnm,./"]),
+    (3.75, [(" ", "", 6.25)]),
+]
+KEYBOARD_WIDTH = 15  # Keys
+
+# Shifted characters are counted on the key that types them
+SHIFTED_KEYS = dict(zip('~!@#$%^&*()_+{}|:"<>?', "`1234567890-=[]\\;',./"))
+
+
+def blend(start, end, fraction):
+    """Mix two #rrggbb colors."""
+    a = [int(start[i:i + 2], 16) for i in (1, 3, 5)]
+    b = [int(end[i:i + 2], 16) for i in (1, 3, 5)]
+    return "#" + "".join(f"{round(x + (y - x) * fraction):02x}" for x, y in zip(a, b))
+
+
+class KeyboardHeatmap:
+    """Keyboard drawn once; each keystroke re-fills at most the key it was typed on.
+
+    Used live as a keystroke listener on the game screen, and as a summary
+    of a finished session (via set_stats) on the results screen.
+    """
+
+    def __init__(self, parent, theme_manager=None, key_size=HEATMAP_KEY_SIZE):
+        self.theme_manager = theme_manager
+        self.stats = {}  # Key -> [keystrokes, errors, latency sum (s), latency count]
+        self.levels = {}  # Key -> shade index currently filled in
+        self.palette = []
+        self.last_timestamp = None
+
+        self.canvas = tk.Canvas(parent, width=KEYBOARD_WIDTH * key_size, height=len(KEYBOARD_ROWS) * key_size,
+                                highlightthickness=0)
+
+        # All items are created once; updates only change their fill
+        font = (FONT, HEATMAP_FONT_SIZE)
+        gap = 2
+        self.key_items = {}  # Key -> rectangle item
+        self.label_items = []
+        for row, (offset, keys) in enumerate(KEYBOARD_ROWS):
+            x = offset * key_size
+            y = row * key_size
+            for key, label, width in keys:
+                right = x + width * key_size
+                self.key_items[key] = self.canvas.create_rectangle(x + gap, y + gap, right - gap, y + key_size - gap)
+                self.label_items.append(self.canvas.create_text((x + right) / 2, y + key_size / 2,
+                                                                text=label, font=font))
+                x = right
+
+        self.apply_theme()
+
+    def pack(self, **kwargs):
+        self.canvas.pack(**kwargs)
+
+    def reset(self):
+        """Clear all key statistics for a new session."""
+        self.stats = {}
+        self.last_timestamp = None
+        self.fill_all()
+
+    def set_stats(self, stats):
+        """Show the statistics of a finished session."""
+        self.stats = {key: list(values) for key, values in stats.items()}
+        self.last_timestamp = None
+        self.fill_all()
+
+    def on_keystroke(self, text, index, typed, is_correct, timestamp):
+        """Keystroke listener: count the keystroke on the key the text asked for."""
+        last, self.last_timestamp = self.last_timestamp, timestamp
+        if typed is None or index >= len(text):
+            return
+        char = text[index].lower()
+        key = SHIFTED_KEYS.get(char, char)
+        if key not in self.key_items:
+            return
+
+        values = self.stats.get(key)
+        if values is None:
+            values = self.stats[key] = [0, 0, 0.0, 0]
+        values[0] += 1
+        if not is_correct:
+            values[1] += 1
+        if last is not None and (timestamp - last) * 1000 <= HEATMAP_MAX_LATENCY_MS:
+            values[2] += timestamp - last
+            values[3] += 1
+        self.fill_key(key)
+
+    def level(self, key):
+        """Shade index of a key: the worse of its error rate and average latency."""
+        keystrokes, errors, latency_sum, latency_count = self.stats[key]
+        badness = errors / keystrokes / HEATMAP_ERROR_RATE_MAX
+        if latency_count:
+            latency_ms = latency_sum / latency_count * 1000
+            badness = max(badness, (latency_ms - HEATMAP_FAST_MS) / (HEATMAP_SLOW_MS - HEATMAP_FAST_MS))
+        return min(HEATMAP_LEVELS - 1, max(0, int(badness * HEATMAP_LEVELS)))
+
+    def fill_key(self, key):
+        """Re-fill one key, skipping the canvas call if its shade is unchanged."""
+        level = self.level(key)
+        if self.levels.get(key) != level and self.palette:
+            self.levels[key] = level
+            self.canvas.itemconfig(self.key_items[key], fill=self.palette[level])
+
+    def fill_all(self):
+        """Fill every key; used on reset, for a summary and after a theme change."""
+        self.levels = {}
+        if not self.palette:
+            return  # No theme yet
+        for key, item in self.key_items.items():
+            if key in self.stats:
+                self.fill_key(key)
+            else:
+                self.canvas.itemconfig(item, fill=self.untyped_fill)
+
+    def apply_theme(self, theme=None):
+        """Recolor the keyboard for the given (or current) theme."""
+        if theme is None:
+            if not self.theme_manager:
+                return
+            theme = self.theme_manager.get_current_theme()
+        self.canvas.config(bg=theme["bg"])
+        self.untyped_fill = theme["button_bg"]
+        self.palette = [blend(theme["correct"], theme["incorrect"], level / (HEATMAP_LEVELS - 1))
+                        for level in range(HEATMAP_LEVELS)]
+        for item in self.key_items.values():
+            self.canvas.itemconfig(item, outline=theme["fg"])
+        for item in self.label_items:
+            self.canvas.itemconfig(item, fill=theme["fg"])
+        self.fill_all()
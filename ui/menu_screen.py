@@ -3,7 +3,9 @@ Menu screen component for the typing trainer application.
 """
 
 import tkinter as tk
-from config.settings import FONT, MENU_FONT_SIZE, STATS_FONT_SIZE, TOP_PADDING
+from tkinter import filedialog
+from config.settings import FONT, MENU_FONT_SIZE, STATS_FONT_SIZE, TOP_PADDING, MAX_CUSTOM_TIME
+from core.curriculum import LESSONS
 
 class MenuScreen:
     def __init__(self, root, callbacks, theme_manager=None):
@@ -21,6 +23,7 @@ class MenuScreen:
         self.menu_frame = tk.Frame(root)
         self.custom_time_frame = tk.Frame(self.menu_frame)
         self.custom_keys_frame = tk.Frame(self.menu_frame)
+        self.lessons_frame = tk.Frame(self.menu_frame)
         self.main_menu_frame = tk.Frame(self.menu_frame)
         
         # Track padding frames for theme updates
@@ -34,6 +37,7 @@ class MenuScreen:
         self.create_menu_screen(bg_color)
         self.create_custom_time_content()
         self.create_custom_keys_content()
+        self.create_lessons_content()
         
         # Initialize with main menu showing
         self.show_main_menu()
@@ -74,23 +78,64 @@ class MenuScreen:
                                   command=lambda: self.callbacks['set_time_mode']("freeplay"), width=10)
         freeplay_button.grid(row=1, column=1, padx=5, pady=5)
         
-        # Settings buttons
+        # Settings buttons, laid out in a grid like the modes
         settings_frame = tk.Frame(parent_frame)
         settings_frame.pack(pady=10)
         
         # Add custom keys button
         custom_keys_button = tk.Button(settings_frame, text="Custom Keys", font=(self.font, self.stats_font_size),
                                      command=self.show_custom_keys, width=10)
-        custom_keys_button.pack(pady=10)
+        custom_keys_button.grid(row=0, column=0, padx=5, pady=5)
+        
+        # Mix due review words into the practice text
+        drill_button = tk.Button(settings_frame, text="Drill: Off", font=(self.font, self.stats_font_size),
+                               command=self.toggle_drill_mode, width=10)
+        drill_button.grid(row=0, column=1, padx=5, pady=5)
+        self.drill_button = drill_button
+        
+        # Race against the best earlier run in timed modes
+        ghost_button = tk.Button(settings_frame, text="Ghost: Off", font=(self.font, self.stats_font_size),
+                               command=self.toggle_ghost_mode, width=10)
+        ghost_button.grid(row=2, column=0, padx=5, pady=5)
+        self.ghost_button = ghost_button
+        
+        # Cycle through the available dictionaries
+        language_button = tk.Button(settings_frame, text=self.callbacks['get_language'](),
+                                  font=(self.font, self.stats_font_size), command=self.next_language, width=10)
+        language_button.grid(row=1, column=0, padx=5, pady=5)
+        self.language_button = language_button
+        
+        # Practise on a book or manual instead of random words
+        text_file_button = tk.Button(settings_frame, text="Open Text", font=(self.font, self.stats_font_size),
+                                   command=self.toggle_text_file, width=10)
+        text_file_button.grid(row=1, column=1, padx=5, pady=5)
+        self.text_file_button = text_file_button
         
         theme_button = tk.Button(settings_frame, text="Dark Mode", font=(self.font, self.stats_font_size),
                                command=self.callbacks['toggle_theme'], width=10)
-        theme_button.pack(pady=10)
+        theme_button.grid(row=2, column=1, padx=5, pady=5)
         self.theme_button = theme_button
         
+        # Built-in curriculum, one row of the keyboard at a time
+        lessons_button = tk.Button(settings_frame, text="Lessons", font=(self.font, self.stats_font_size),
+                                 command=self.show_lessons, width=10)
+        lessons_button.grid(row=3, column=0, padx=5, pady=5)
+        self.lessons_button = lessons_button
+        
+        # Practise on real source code from a directory
+        code_button = tk.Button(settings_frame, text="Open Code", font=(self.font, self.stats_font_size),
+                              command=self.toggle_code_directory, width=10)
+        code_button.grid(row=3, column=1, padx=5, pady=5)
+        self.code_button = code_button
+        
+        # Exam text is the same for every candidate, so it cannot come from the user's files or reviews
+        if self.callbacks['is_exam']():
+            for button in (drill_button, text_file_button, code_button):
+                button.config(state=tk.DISABLED)
+        
         exit_button = tk.Button(settings_frame, text="Exit", font=(self.font, self.stats_font_size),
                                 command=self.callbacks['exit_application'], width=10)
-        exit_button.pack(pady=10)
+        exit_button.grid(row=4, column=0, columnspan=2, padx=5, pady=5)
     
     def create_custom_time_content(self):
         time_label = tk.Label(self.custom_time_frame, text="Enter time in seconds:", 
@@ -151,16 +196,36 @@ class MenuScreen:
                                 width=10)
         cancel_button.pack(side=tk.RIGHT, padx=10)
     
+    def create_lessons_content(self):
+        lessons_label = tk.Label(self.lessons_frame, text="Choose a lesson:",
+                               font=(self.font, self.stats_font_size))
+        lessons_label.pack(pady=10)
+        
+        for lesson in LESSONS:
+            lesson_button = tk.Button(self.lessons_frame, text=lesson['name'],
+                                    font=(self.font, int(self.stats_font_size*0.8)),
+                                    command=lambda name=lesson['name']: self.set_lesson(name),
+                                    width=15)
+            lesson_button.pack(pady=2)
+        
+        cancel_button = tk.Button(self.lessons_frame, text="Cancel", 
+                                font=(self.font, self.stats_font_size),
+                                command=self.show_main_menu,
+                                width=10)
+        cancel_button.pack(pady=10)
+    
     def show_main_menu(self):
         # Hide custom time input and show main menu
         self.custom_time_frame.pack_forget()
         self.custom_keys_frame.pack_forget()
+        self.lessons_frame.pack_forget()
         self.main_menu_frame.pack(pady=20)
     
     def show_custom_time(self):
         # Hide main menu and show custom time input
         self.main_menu_frame.pack_forget()
         self.custom_keys_frame.pack_forget()
+        self.lessons_frame.pack_forget()
         self.custom_time_frame.pack(pady=20)
         self.time_entry.focus_set()
         self.time_entry.delete(0, tk.END)  # Clear any previous input
@@ -169,18 +234,85 @@ class MenuScreen:
         # Hide main menu and show custom keys input
         self.main_menu_frame.pack_forget()
         self.custom_time_frame.pack_forget()
+        self.lessons_frame.pack_forget()
         self.custom_keys_frame.pack(pady=20)
         self.keys_entry.focus_set()
         self.keys_entry.delete(0, tk.END)
         self.keys_entry.insert(0, self.callbacks['get_keys_to_use']())
     
+    def toggle_drill_mode(self):
+        enabled = self.callbacks['toggle_drill_mode']()
+        self.drill_button.config(text="Drill: On" if enabled else "Drill: Off")
+    
+    def toggle_ghost_mode(self):
+        enabled = self.callbacks['toggle_ghost_mode']()
+        self.ghost_button.config(text="Ghost: On" if enabled else "Ghost: Off")
+    
+    def next_language(self):
+        languages = self.callbacks['get_languages']()
+        current = self.callbacks['get_language']()
+        language = languages[(languages.index(current) + 1) % len(languages)]
+        self.callbacks['set_language'](language)
+        self.language_button.config(text=language)
+    
+    def toggle_text_file(self):
+        if self.callbacks['get_text_source_kind']() == 'text':
+            self.callbacks['close_text_file']()
+        else:
+            path = filedialog.askopenfilename(title="Choose a text to practise on",
+                                              filetypes=[("Text files", "*.txt"), ("All files", "*")])
+            if path:
+                self.callbacks['open_text_file'](path)
+        self.update_source_buttons()
+    
+    def toggle_code_directory(self):
+        if self.callbacks['is_indexing_code']():
+            self.callbacks['cancel_code_index']()
+        elif self.callbacks['get_text_source_kind']() == 'code':
+            self.callbacks['close_text_file']()
+        else:
+            path = filedialog.askdirectory(title="Choose a directory of source code to practise on")
+            if path:
+                self.callbacks['open_code_directory'](path)
+        self.update_source_buttons()
+    
+    def update_source_buttons(self):
+        # Only one text or code source is open at a time
+        kind = self.callbacks['get_text_source_kind']()
+        self.text_file_button.config(text="Close Text" if kind == 'text' else "Open Text")
+        if self.callbacks['is_indexing_code']():
+            self.code_button.config(text="Indexing")
+        else:
+            self.code_button.config(text="Close Code" if kind == 'code' else "Open Code")
+    
+    def show_index_progress(self, done, total):
+        # Clicking the button while it shows progress cancels indexing
+        self.code_button.config(text=f"Index {done * 100 // total}%" if total else "Indexing")
+    
+    def show_lessons(self):
+        # Hide main menu and show the lesson list
+        self.main_menu_frame.pack_forget()
+        self.custom_time_frame.pack_forget()
+        self.custom_keys_frame.pack_forget()
+        self.lessons_frame.pack(pady=20)
+    
+    def set_lesson(self, name):
+        self.callbacks['set_lesson'](name)
+        self.show_main_menu()
+    
+    def show_lessons_building(self, building):
+        # The lessons of a new dictionary are built in the background
+        self.lessons_button.config(text="Building..." if building else "Lessons")
+    
     def set_custom_time(self, time_str):
         try:
             time_sec = int(time_str)
-            if time_sec > 0:
+            if 0 < time_sec <= MAX_CUSTOM_TIME:
                 self.callbacks['set_custom_time'](time_sec)
                 self.show_main_menu()  # First return to main menu
                 self.callbacks['set_time_mode']("custom")  # Then set the time mode
+            elif time_sec > MAX_CUSTOM_TIME:
+                tk.messagebox.showerror("Invalid Input", f"Please enter at most {MAX_CUSTOM_TIME} seconds.")
             else:
                 # Show error if time is zero or negative
                 tk.messagebox.showerror("Invalid Input", "Please enter a positive number of seconds.")
@@ -206,6 +338,7 @@ class MenuScreen:
             'main_menu_frame': self.main_menu_frame,
             'custom_time_frame': self.custom_time_frame,
             'custom_keys_frame': self.custom_keys_frame,
+            'lessons_frame': self.lessons_frame,
             'padding_frames': self.padding_frames,
             'theme_button': self.theme_button
         }
\ No newline at end of file
@@ -4,6 +4,8 @@ Results screen component for the typing trainer application.
 
 import tkinter as tk
 from config.settings import FONT, MENU_FONT_SIZE, STATS_FONT_SIZE, TOP_PADDING
+from ui.wpm_chart import WpmChart
+from ui.keyboard_heatmap import KeyboardHeatmap
 
 class ResultsScreen:
     def __init__(self, root, callbacks, theme_manager=None):
@@ -38,24 +40,37 @@ class ResultsScreen:
         
         # Results title
         results_title = tk.Label(self.results_frame, text="Your Results", font=(self.font, self.menu_font_size, "bold"))
-        results_title.pack(pady=20)
+        results_title.pack(pady=10)
         
         # Statistics display
         stats_display = tk.Frame(self.results_frame)
-        stats_display.pack(pady=20)
+        stats_display.pack(pady=10)
         
+        # Stats sit side by side to leave room for the chart below
         self.result_wpm_label = tk.Label(stats_display, text="WPM: 0", font=(self.font, self.menu_font_size))
-        self.result_wpm_label.pack(pady=5)
+        self.result_wpm_label.pack(side=tk.LEFT, padx=10)
         
         self.result_accuracy_label = tk.Label(stats_display, text="Accuracy: 100%", font=(self.font, self.menu_font_size))
-        self.result_accuracy_label.pack(pady=5)
+        self.result_accuracy_label.pack(side=tk.LEFT, padx=10)
         
         self.result_time_label = tk.Label(stats_display, text="Time: 00:00", font=(self.font, self.menu_font_size))
-        self.result_time_label.pack(pady=5)
+        self.result_time_label.pack(side=tk.LEFT, padx=10)
+        
+        # Standing against everyone in the last leaderboard summary
+        self.rank_label = tk.Label(self.results_frame, text="", font=(self.font, self.stats_font_size))
+        self.rank_label.pack()
+        
+        # WPM and accuracy over the session
+        self.chart = WpmChart(self.results_frame, self.theme_manager)
+        self.chart.pack(fill=tk.X, padx=20)
+        
+        # Error rate and latency per key over the whole session
+        self.heatmap = KeyboardHeatmap(self.results_frame, self.theme_manager)
+        self.heatmap.pack(pady=10)
         
         # Buttons
         button_frame = tk.Frame(self.results_frame)
-        button_frame.pack(pady=20)
+        button_frame.pack(pady=10)
         
         menu_button = tk.Button(button_frame, text="Menu", font=(self.font, self.stats_font_size),
                              command=self.callbacks['show_menu'], width=10)
@@ -65,14 +80,17 @@ class ResultsScreen:
                              command=self.callbacks['exit_application'], width=10)
         exit_button.pack(side=tk.RIGHT, padx=10)
     
-    def update_results(self, wpm, accuracy, elapsed_time):
-        """Update the result labels with final stats."""
+    def update_results(self, wpm, accuracy, elapsed_time, samples=None, rank=None, key_stats=None):
+        """Update the result labels, chart and keyboard heatmap with final stats."""
         minutes = int(elapsed_time // 60)
         seconds = int(elapsed_time % 60)
         
         self.result_wpm_label.config(text=f"WPM: {wpm}")
         self.result_accuracy_label.config(text=f"Accuracy: {accuracy:.1f}%")
         self.result_time_label.config(text=f"Time: {minutes:02d}:{seconds:02d}")
+        self.rank_label.config(text=rank or "")
+        self.chart.set_samples(samples or [])
+        self.heatmap.set_stats(key_stats or {})
     
     def show(self):
         self.results_frame.pack(expand=True, fill="both")
@@ -83,5 +101,7 @@ class ResultsScreen:
     def get_frames(self):
         return {
             'results_frame': self.results_frame,
+            'results_chart': self.chart,
+            'results_heatmap': self.heatmap,
             'padding_frames': self.padding_frames
         }
\ No newline at end of file
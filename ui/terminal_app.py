@@ -0,0 +1,318 @@
+"""
+Curses front end for terminals and SSH sessions.
+
+Shares the text generator, scoring and time modes with the Tk front end but
+creates no widgets, so it starts quickly and runs on headless machines.
+"""
+
+import curses
+import json
+import random
+import re
+
+from config.settings import DEFAULT_KEYS, RESULTS_PATH, TERMINAL_TICK_MS, WRITER_EXIT_TIMEOUT, MAX_CUSTOM_TIME
+from core.persistence import BackgroundWriter
+from core import metrics
+from core.stats_manager import StatsManager, time_limit_for
+from core.text_generator import TextGenerator
+
+BACKSPACE_KEYS = (curses.KEY_BACKSPACE, '\b', '\x7f')
+ESCAPE = '\x1b'
+TEXT_TOP = 2  # Screen row of the first text line
+TEXT_MARGIN = 2  # Columns left free on both sides of the text
+
+# Colour pair numbers
+PAIR_CORRECT = 1
+PAIR_INCORRECT = 2
+
+# Menu key -> time mode
+MENU_KEYS = {'1': "1min", '5': "5min", 'f': "freeplay", 'c': "custom"}
+
+# A word with the space or newline that follows it
+SEGMENT = re.compile(r'[^ \n]*[ \n]?')
+
+
+class TerminalApp:
+    def __init__(self, keys_to_use=DEFAULT_KEYS):
+        self.keys_to_use = keys_to_use
+        self.writer = BackgroundWriter()
+        self.text_generator = TextGenerator(writer=self.writer)
+        self.stats_manager = StatsManager({})  # Scoring only; stats are drawn here
+        self.time_mode = "freeplay"
+        self.custom_time = 0
+        self.session_seed = None
+        self.session_rng = random.Random()
+
+        self.screen = None
+        self.text = ""
+        self.index = 0
+        self.results = []  # Per character: None (not typed yet), True or False
+        self.positions = []  # Per character: (row, column) within the text area
+        self.status = None  # Status line currently on screen
+        self.message = ""
+
+    def run(self):
+        try:
+            curses.wrapper(self.main)
+        finally:
+            self.text_generator.close_text_source()
+            if not self.writer.close(timeout=WRITER_EXIT_TIMEOUT):
+                print(f"Warning: pending saves did not finish within {WRITER_EXIT_TIMEOUT}s")
+
+    def main(self, screen):
+        self.screen = screen
+        if hasattr(curses, 'set_escdelay'):
+            curses.set_escdelay(25)  # Esc is a key here, not the start of a sequence
+        if curses.has_colors():
+            curses.start_color()
+            try:
+                curses.use_default_colors()
+                background = -1
+            except curses.error:
+                background = curses.COLOR_BLACK
+            curses.init_pair(PAIR_CORRECT, curses.COLOR_GREEN, background)
+            curses.init_pair(PAIR_INCORRECT, curses.COLOR_RED, background)
+
+        while self.show_menu():
+            # Play until the player leaves the results screen for the menu
+            while self.play() and self.show_results():
+                pass
+
+    def read_key(self):
+        try:
+            return self.screen.get_wch()
+        except curses.error:
+            return None  # No key before the timeout
+        except KeyboardInterrupt:
+            return ESCAPE
+
+    def show_menu(self):
+        """Show the menu until a time mode is chosen; False to quit."""
+        self.screen.timeout(-1)
+        while True:
+            self.screen.erase()
+            lesson = self.text_generator.lesson
+            lines = [
+                "Typing Trainer",
+                "",
+                f"Keys: {self.keys_to_use}" + (f"  (lesson: {lesson.name})" if lesson else ""),
+                f"Language: {self.text_generator.language}",
+                "",
+                "[1] 1 minute   [5] 5 minutes   [f] freeplay   [c] custom time",
+                "[k] custom keys   [d] default keys   [l] next language   [q] quit",
+                "",
+                self.message,
+            ]
+            for row, line in enumerate(lines):
+                self.add_text(row, TEXT_MARGIN, line, curses.A_BOLD if row == 0 else 0)
+
+            key = self.read_key()
+            self.message = ""
+            if key in ('q', ESCAPE):
+                return False
+            if key in MENU_KEYS:
+                self.time_mode = MENU_KEYS[key]
+                if self.time_mode == "custom":
+                    seconds = self.prompt("Seconds: ")
+                    if not seconds.isdigit() or not 0 < int(seconds) <= MAX_CUSTOM_TIME:
+                        self.message = f"Enter a number of seconds from 1 to {MAX_CUSTOM_TIME}"
+                        continue
+                    self.custom_time = int(seconds)
+                return True
+            if key == 'k':
+                keys = self.prompt("Keys: ")
+                if keys:
+                    self.keys_to_use = keys
+                    self.text_generator.set_lesson(None)
+            elif key == 'd':
+                self.keys_to_use = DEFAULT_KEYS
+                self.text_generator.set_lesson(None)
+            elif key == 'l':
+                languages = self.text_generator.get_languages()
+                position = languages.index(self.text_generator.language)
+                self.text_generator.set_language(languages[(position + 1) % len(languages)])
+
+    def prompt(self, label):
+        """Read a line of input below the menu."""
+        row = min(10, self.screen.getmaxyx()[0] - 1)
+        self.add_text(row, TEXT_MARGIN, label)
+        curses.echo()
+        try:
+            value = self.screen.getstr(row, TEXT_MARGIN + len(label), 40)
+        except curses.error:
+            value = b""
+        finally:
+            curses.noecho()
+        return value.decode('utf-8', 'replace').strip()
+
+    def play(self):
+        """Run one session; False if the player went back to the menu."""
+        metrics.SESSIONS_STARTED.inc()
+        self.stats_manager.reset_stats(time_limit_for(self.time_mode, self.custom_time))
+        self.session_seed = random.getrandbits(32)
+        self.session_rng = random.Random(self.session_seed)
+        self.new_text()
+        last_second = 0
+
+        self.screen.timeout(TERMINAL_TICK_MS)
+        while True:
+            elapsed_time = self.stats_manager.get_elapsed_time()
+            if int(elapsed_time) > last_second:
+                # One chart sample per second, as the Tk timer does
+                last_second = int(elapsed_time)
+                self.stats_manager.record_sample(elapsed_time)
+            if self.stats_manager.is_time_up(elapsed_time):
+                return True
+            self.draw_status(elapsed_time)
+            self.move_cursor()
+
+            key = self.read_key()
+            if key is None:
+                continue
+            if key == ESCAPE:
+                return False
+            if key == curses.KEY_RESIZE:
+                self.redraw()
+            elif key in BACKSPACE_KEYS:
+                self.backspace()
+            elif isinstance(key, str):
+                if key == '\r':
+                    key = '\n'
+                if key.isprintable() or key == '\n':
+                    self.type_char(key)
+
+    def new_text(self):
+        self.text = self.text_generator.create_english_sentence(self.keys_to_use, rng=self.session_rng)
+        self.index = 0
+        self.results = [None] * len(self.text)
+        self.redraw()
+
+    @metrics.KEY_PRESS_SECONDS.time
+    def type_char(self, char):
+        is_correct = char == self.text[self.index]
+        self.stats_manager.register_keystroke(is_correct)
+        metrics.record_keystroke(is_correct)
+        self.results[self.index] = is_correct
+        self.draw_cell(self.index)
+        self.index += 1
+        if self.index == len(self.text):
+            self.new_text()
+
+    @metrics.KEY_PRESS_SECONDS.time
+    def backspace(self):
+        if self.index == 0:
+            return
+        self.index -= 1
+        if self.results[self.index] is not None:
+            self.stats_manager.remove_keystroke(self.results[self.index])
+        self.results[self.index] = None
+        self.draw_cell(self.index)
+
+    def layout(self):
+        """Word-wrap the text to the terminal width."""
+        width = max(10, self.screen.getmaxyx()[1] - 2 * TEXT_MARGIN)
+        self.positions = []
+        row = column = 0
+        for match in SEGMENT.finditer(self.text):
+            segment = match.group()
+            if not segment:
+                continue
+            word_length = len(segment.rstrip(' \n'))
+            if column and column + word_length > width:
+                row += 1
+                column = 0
+            for char in segment:
+                self.positions.append((row, column))
+                if char == '\n':
+                    row += 1
+                    column = 0
+                elif char != ' ' and column + 1 >= width:
+                    # Words longer than a line are broken
+                    row += 1
+                    column = 0
+                else:
+                    column += 1  # A trailing space may overhang the line
+
+    def redraw(self):
+        """Lay out and draw everything; used for new text and resizes only."""
+        self.layout()
+        self.screen.erase()
+        self.status = None
+        for index in range(len(self.text)):
+            self.draw_cell(index)
+
+    def draw_cell(self, index):
+        """Draw one character in the colour of its result."""
+        row, column = self.positions[index]
+        char = self.text[index]
+        result = self.results[index]
+        attributes = 0
+        if result is not None:
+            attributes = curses.color_pair(PAIR_CORRECT if result else PAIR_INCORRECT)
+            if not result:
+                attributes |= curses.A_UNDERLINE  # Keeps wrong spaces visible
+        if char == '\n':
+            char = ' '
+        self.add_text(TEXT_TOP + row, TEXT_MARGIN + column, char, attributes)
+
+    def draw_status(self, elapsed_time):
+        wpm = self.stats_manager.calculate_wpm()
+        accuracy = self.stats_manager.calculate_accuracy()
+        status = (f"{self.stats_manager.time_text(elapsed_time)}   WPM: {wpm}   "
+                  f"Accuracy: {accuracy:.1f}%   [Esc] menu")
+        if status != self.status:
+            self.status = status
+            self.screen.move(0, 0)
+            self.screen.clrtoeol()
+            self.add_text(0, TEXT_MARGIN, status, curses.A_BOLD)
+
+    def move_cursor(self):
+        if self.index < len(self.positions):
+            row, column = self.positions[self.index]
+            try:
+                self.screen.move(TEXT_TOP + row, TEXT_MARGIN + column)
+            except curses.error:
+                pass
+
+    def add_text(self, row, column, text, attributes=0):
+        """Write text, clipped to the screen instead of raising."""
+        rows, columns = self.screen.getmaxyx()
+        if row >= rows or column >= columns:
+            return
+        try:
+            self.screen.addstr(row, column, text[:columns - column - 1], attributes)
+        except curses.error:
+            pass
+
+    def show_results(self):
+        """Save and show the finished session; True to play again."""
+        metrics.SESSIONS_COMPLETED.inc()
+        stats = self.stats_manager
+        wpm = stats.calculate_wpm()
+        accuracy = stats.calculate_accuracy()
+        elapsed_time = stats.get_elapsed_time()
+        stats.record_sample(elapsed_time)
+
+        lesson = self.text_generator.lesson
+        record = stats.build_record(wpm, accuracy, elapsed_time, {
+            'mode': self.time_mode,
+            'keys': self.keys_to_use,
+            'language': self.text_generator.language,
+            'lesson': lesson.name if lesson else None,
+            'seed': self.session_seed,
+        })
+        self.writer.append(RESULTS_PATH, json.dumps(record) + "\n")
+
+        minutes = int(elapsed_time // 60)
+        seconds = int(elapsed_time % 60)
+        self.screen.erase()
+        self.add_text(0, TEXT_MARGIN, "Your Results", curses.A_BOLD)
+        self.add_text(2, TEXT_MARGIN, f"WPM: {wpm}   Accuracy: {accuracy:.1f}%   Time: {minutes:02d}:{seconds:02d}")
+        self.add_text(4, TEXT_MARGIN, "[r] play again   [Enter] menu")
+        self.screen.timeout(-1)
+        while True:
+            key = self.read_key()
+            if key == 'r':
+                return True
+            if key in ('\n', '\r', ESCAPE, 'q', 'm'):
+                return False
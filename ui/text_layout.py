@@ -0,0 +1,102 @@
+"""
+Line layout for the typing text based on measured glyph widths.
+"""
+
+class GlyphMetrics:
+    """Width of single characters in a font, measured once and cached."""
+
+    # Shared by every instance so each font/character pair is measured only once
+    width_cache = {}
+
+    def __init__(self, font):
+        self.font = font
+        self.widths = self.width_cache.setdefault(self.font_key(font), {})
+        self.line_height = font.metrics("linespace")
+
+    @staticmethod
+    def font_key(font):
+        actual = font.actual()
+        return (actual["family"], actual["size"], actual["weight"], actual["slant"])
+
+    def width(self, char):
+        width = self.widths.get(char)
+        if width is None:
+            width = self.font.measure(char)
+            self.widths[char] = width
+        return width
+
+
+class TextLayout:
+    """Compute the position of every character of a text for a given width."""
+
+    def __init__(self, metrics, char_spacing=0, line_spacing=0):
+        self.metrics = metrics
+        self.char_spacing = char_spacing
+        self.line_spacing = line_spacing
+
+    def advance(self, char):
+        return self.metrics.width(char) + self.char_spacing
+
+    def break_lines(self, text, max_width):
+        """Return the start index of every line.
+
+        Lines break after the space that ends the last word fitting in
+        max_width; that space stays at the end of its line so every character
+        keeps a position. A newline always starts a new line and a word wider
+        than the whole line is split.
+        """
+        starts = [0]
+        line_width = 0
+        word_start = 0
+        word_width = 0
+
+        for i, char in enumerate(text):
+            if char == "\n":
+                if i + 1 < len(text):
+                    starts.append(i + 1)
+                line_width = word_width = 0
+                word_start = i + 1
+                continue
+
+            width = self.advance(char)
+            if char == " ":
+                # Trailing spaces may overhang the edge
+                line_width += width
+                word_start = i + 1
+                word_width = 0
+                continue
+
+            if line_width + width > max_width and line_width > 0:
+                if word_start > starts[-1]:
+                    # Move the current word to the next line
+                    starts.append(word_start)
+                    line_width = word_width
+                else:
+                    # The word alone is too wide: split it here
+                    starts.append(i)
+                    line_width = 0
+                    word_start = i
+                    word_width = 0
+
+            line_width += width
+            word_width += width
+
+        return starts
+
+    def place(self, text, line_starts):
+        """Return the (x, y) of every character and the block's (width, height)."""
+        positions = []
+        line_height = self.metrics.line_height + self.line_spacing
+        block_width = 0
+        ends = line_starts[1:] + [len(text)]
+
+        for row, (start, end) in enumerate(zip(line_starts, ends)):
+            x = 0
+            y = row * line_height
+            for i in range(start, end):
+                positions.append((x, y))
+                if text[i] != "\n":
+                    x += self.advance(text[i])
+            block_width = max(block_width, x)
+
+        return positions, (block_width, len(line_starts) * line_height)
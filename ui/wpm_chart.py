@@ -0,0 +1,107 @@
+"""
+WPM and accuracy chart for the results screen.
+"""
+
+import tkinter as tk
+from config.settings import FONT, CHART_HEIGHT, CHART_PADDING, CHART_FONT_SIZE
+from core.downsample import lttb
+
+class WpmChart:
+    def __init__(self, parent, theme_manager=None):
+        self.theme_manager = theme_manager
+        self.padding = CHART_PADDING
+        self.samples = []
+        self.width = 0
+        self.height = CHART_HEIGHT
+        self.max_wpm = 1
+        self.series_cache = {}  # Plot width -> downsampled (wpm, accuracy) points
+
+        self.canvas = tk.Canvas(parent, height=CHART_HEIGHT, highlightthickness=0)
+
+        # All items are created once; later draws only move them
+        font = (FONT, CHART_FONT_SIZE)
+        self.axis_item = self.canvas.create_line(0, 0, 0, 0, 0, 0)
+        self.accuracy_item = self.canvas.create_line(0, 0, 0, 0, width=1, dash=(3, 2))
+        self.wpm_item = self.canvas.create_line(0, 0, 0, 0, width=2)
+        self.max_label = self.canvas.create_text(0, 0, anchor="nw", font=font)
+        self.accuracy_label = self.canvas.create_text(0, 0, anchor="ne", font=font, text="Accuracy")
+        self.time_label = self.canvas.create_text(0, 0, anchor="se", font=font)
+
+        self.canvas.bind("<Configure>", self.on_resize)
+        self.apply_theme()
+
+    def pack(self, **kwargs):
+        self.canvas.pack(**kwargs)
+
+    def set_samples(self, samples):
+        """Replace the plotted session samples, given as (elapsed, wpm, accuracy)."""
+        self.samples = samples
+        self.series_cache = {}
+        self.max_wpm = max([wpm for _, wpm, _ in samples] + [1])
+        duration = samples[-1][0] if samples else 0
+        self.canvas.itemconfig(self.max_label, text=f"{self.max_wpm} WPM")
+        self.canvas.itemconfig(self.time_label, text=f"{int(duration // 60):02d}:{int(duration % 60):02d}")
+        self.redraw()
+
+    def on_resize(self, event):
+        if event.width != self.width or event.height != self.height:
+            self.width = event.width
+            self.height = event.height
+            self.redraw()
+
+    def get_series(self, plot_width):
+        """Return both series reduced to at most one point per pixel column."""
+        if plot_width not in self.series_cache:
+            wpm_points = [(t, wpm) for t, wpm, _ in self.samples]
+            accuracy_points = [(t, accuracy) for t, _, accuracy in self.samples]
+            # Only the most recent width is needed while the window is resized
+            self.series_cache = {plot_width: (lttb(wpm_points, plot_width), lttb(accuracy_points, plot_width))}
+        return self.series_cache[plot_width]
+
+    def redraw(self):
+        """Move the existing canvas items to fit the current size."""
+        pad = self.padding
+        left, top = pad, pad
+        right, bottom = self.width - pad, self.height - pad
+        plot_width = int(right - left)
+        if plot_width < 2 or bottom <= top:
+            return
+
+        self.canvas.coords(self.axis_item, left, top, left, bottom, right, bottom)
+        self.canvas.coords(self.max_label, left + 4, top)
+        self.canvas.coords(self.accuracy_label, right, top)
+        self.canvas.coords(self.time_label, right, bottom - 2)
+
+        if len(self.samples) < 2:
+            self.canvas.itemconfig(self.wpm_item, state="hidden")
+            self.canvas.itemconfig(self.accuracy_item, state="hidden")
+            return
+
+        duration = self.samples[-1][0] or 1
+        x_scale = (right - left) / duration
+        wpm_points, accuracy_points = self.get_series(plot_width)
+
+        wpm_coords = []
+        for t, wpm in wpm_points:
+            wpm_coords += (left + t * x_scale, bottom - (bottom - top) * wpm / self.max_wpm)
+        accuracy_coords = []
+        for t, accuracy in accuracy_points:
+            accuracy_coords += (left + t * x_scale, bottom - (bottom - top) * accuracy / 100)
+
+        self.canvas.coords(self.wpm_item, *wpm_coords)
+        self.canvas.coords(self.accuracy_item, *accuracy_coords)
+        self.canvas.itemconfig(self.wpm_item, state="normal")
+        self.canvas.itemconfig(self.accuracy_item, state="normal")
+
+    def apply_theme(self, theme=None):
+        """Recolor the chart items for the given (or current) theme."""
+        if theme is None:
+            if not self.theme_manager:
+                return
+            theme = self.theme_manager.get_current_theme()
+        self.canvas.config(bg=theme["bg"])
+        self.canvas.itemconfig(self.axis_item, fill=theme["fg"])
+        self.canvas.itemconfig(self.wpm_item, fill=theme["correct"])
+        self.canvas.itemconfig(self.accuracy_item, fill=theme["fg"])
+        for item in (self.max_label, self.accuracy_label, self.time_label):
+            self.canvas.itemconfig(item, fill=theme["fg"])